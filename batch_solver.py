@@ -0,0 +1,168 @@
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from iterative_solver import CooMatrix, solve_mna
+
+
+# Scenarios per stacked dense solve are capped so one stack holds about this many matrix entries.
+DENSE_STACK_ENTRIES = 2 ** 24
+
+
+def solve_dense_batch(n, rows, cols, vals, z):
+    """
+    Solve one n x n system per scenario: vals is (scenarios, nnz) over the shared
+    COO pattern (rows, cols), z is (scenarios, n). The matrices are assembled
+    with one bincount per stack and handed to LAPACK as a stacked solve.
+    Returns (x, failed) where failed marks scenarios whose matrix was singular.
+    """
+    scenarios = len(z)
+    x = np.full((scenarios, n), np.nan)
+    failed = np.zeros(scenarios, dtype=bool)
+    flat = rows * n + cols
+    step = max(1, DENSE_STACK_ENTRIES // max(1, n * n))
+    for start in range(0, scenarios, step):
+        stop = min(start + step, scenarios)
+        count = stop - start
+        index = (np.arange(count)[:, None] * (n * n) + flat).ravel()
+        A = np.bincount(index, weights=vals[start:stop].ravel(), minlength=count * n * n)
+        A = A.astype(float).reshape(count, n, n)
+        try:
+            x[start:stop] = np.linalg.solve(A, z[start:stop, :, None])[..., 0]
+        except np.linalg.LinAlgError:
+            # One singular scenario fails the whole stack; solve them one at a time instead.
+            for k in range(count):
+                try:
+                    x[start + k] = np.linalg.solve(A[k], z[start + k])
+                except np.linalg.LinAlgError:
+                    failed[start + k] = True
+    failed |= ~np.isfinite(x).all(axis=1)
+    return x, failed
+
+
+def solve_sparse_scenarios(n, rows, cols, vals, z, num_nodes, tol, max_iter, x=None, failed=None):
+    """
+    Iterative solves of consecutive scenarios on the shared COO pattern, each
+    warm-started from the previous scenario's solution. Solutions go into x and
+    failed when given (views into shared memory in pool workers).
+    """
+    x = np.full(z.shape, np.nan) if x is None else x
+    failed = np.zeros(len(z), dtype=bool) if failed is None else failed
+    x0 = None
+    for k in range(len(z)):
+        A = CooMatrix(n, rows, cols, vals[k])
+        try:
+            solution, _, residual = solve_mna(A, z[k], num_nodes, x0=x0, tol=tol, max_iter=max_iter)
+        except np.linalg.LinAlgError:
+            solution, residual = None, np.inf
+        if not residual <= tol:
+            x[k] = np.nan
+            failed[k] = True
+            continue
+        x[k] = x0 = solution
+        failed[k] = False
+    return x, failed
+
+
+def attach_arrays(spec):
+    """
+    Numpy views of the shared memory blocks described by spec
+    ({key: (block name, shape, dtype)}), plus the blocks to close afterwards.
+    """
+    blocks, arrays = [], {}
+    for key, (name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return arrays, blocks
+
+
+def solve_shared_chunk(spec, start, stop, num_nodes, tol, max_iter):
+    """
+    Pool task: solve scenarios start:stop of a job in shared memory, writing
+    the solutions and failure flags in place.
+    """
+    arrays, blocks = attach_arrays(spec)
+    try:
+        solve_sparse_scenarios(arrays["x"].shape[1], arrays["rows"], arrays["cols"], arrays["vals"][start:stop],
+                               arrays["z"][start:stop], num_nodes, tol, max_iter,
+                               arrays["x"][start:stop], arrays["failed"][start:stop])
+    finally:
+        del arrays
+        for block in blocks:
+            block.close()
+
+
+class SharedBatchPool:
+    """
+    Process pool for the iterative path of solve_batch that stays alive across
+    jobs, so worker start-up is paid once. The COO pattern, the scenario
+    values and right-hand sides and the result buffers of a job are placed in
+    multiprocessing.shared_memory; workers attach to them by name and write
+    their slice of the solutions in place, so a task only pickles the block
+    names and its slice bounds.
+    """
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = None
+
+    def share(self, arrays):
+        """
+        Copy arrays into new shared memory blocks. Returns the spec workers
+        attach with, the blocks and the parent's views of them.
+        """
+        spec, blocks, views = {}, [], {}
+        for key, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            blocks.append(block)
+            views[key] = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            views[key][...] = array
+            spec[key] = (block.name, array.shape, array.dtype.str)
+        return spec, blocks, views
+
+    def solve(self, n, rows, cols, vals, z, num_nodes, tol, max_iter):
+        """
+        Same result as solve_sparse_scenarios, computed in contiguous scenario
+        chunks, one per worker.
+        """
+        if self.executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        scenarios = len(z)
+        spec, blocks, views = self.share({
+            "rows": np.ascontiguousarray(rows, dtype=np.int64),
+            "cols": np.ascontiguousarray(cols, dtype=np.int64),
+            "vals": np.ascontiguousarray(vals, dtype=float),
+            "z": np.ascontiguousarray(z, dtype=float),
+            "x": np.full((scenarios, n), np.nan),
+            "failed": np.ones(scenarios, dtype=bool),
+        })
+        try:
+            bounds = np.linspace(0, scenarios, min(self.max_workers, scenarios) + 1).astype(int).tolist()
+            futures = [self.executor.submit(solve_shared_chunk, spec, start, stop, num_nodes, tol, max_iter)
+                       for start, stop in zip(bounds[:-1], bounds[1:])]
+            for future in futures:
+                future.result()
+            return views["x"].copy(), views["failed"].copy()
+        finally:
+            # The views must go before the blocks can be closed.
+            views.clear()
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+def solve_sparse_batch(n, rows, cols, vals, z, num_nodes, tol, max_iter, pool=None):
+    """
+    Iterative solves of all scenarios, on pool (a SharedBatchPool) when it has
+    more than one worker and there is more than one scenario.
+    """
+    if pool is None or pool.max_workers <= 1 or len(z) <= 1:
+        return solve_sparse_scenarios(n, rows, cols, vals, z, num_nodes, tol, max_iter)
+    return pool.solve(n, rows, cols, vals, z, num_nodes, tol, max_iter)
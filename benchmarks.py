@@ -0,0 +1,297 @@
+"""
+Benchmark harness for the simulation engine.
+
+Generates parameterized circuit families, solves each one and records the
+per-phase SolveStats of the run, aggregated as machine-readable JSON so runs
+can be compared across commits:
+
+    python benchmarks.py --output bench.json
+    python benchmarks.py --baseline bench.json --threshold 1.25
+    python benchmarks.py --startup --startup-budget 300
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+
+import numpy as np
+
+from circuit_simulator import CircuitSimulator
+from circuit_elements import CircuitElement, Wire
+
+
+def element(name, value, element_type, node1, node2):
+    e = CircuitElement(name, value, element_type)
+    e.nodes = [node1, node2]
+    return e
+
+
+def resistor_ladder(size):
+    """
+    Source driving a chain of series resistors with a shunt to ground at every node.
+    """
+    elements = [element("V1", 10.0, 'voltage_source', 1, 0)]
+    for i in range(1, size + 1):
+        elements.append(element(f"Rs{i}", 1.0 + i % 5, 'resistor', i, i + 1))
+        elements.append(element(f"Rp{i}", 100.0, 'resistor', i + 1, 0))
+    return elements
+
+
+def grid_2d(size):
+    """
+    size x size resistor mesh fed by one voltage and one current source.
+    """
+    return mesh((size, size))
+
+
+def grid_3d(size):
+    return mesh((size, size, size))
+
+
+def mesh(shape):
+    index = np.arange(int(np.prod(shape))).reshape(shape) + 1
+    elements = [element("V1", 5.0, 'voltage_source', int(index.flat[0]), 0),
+                element("I1", 0.01, 'current_source', 0, int(index.flat[-1]))]
+    for axis in range(len(shape)):
+        a = np.take(index, range(shape[axis] - 1), axis=axis).ravel()
+        b = np.take(index, range(1, shape[axis]), axis=axis).ravel()
+        for k, (n1, n2) in enumerate(zip(a.tolist(), b.tolist())):
+            elements.append(element(f"R{axis}_{k}", 1.0 + (n1 + n2) % 3, 'resistor', n1, n2))
+    elements.append(element("Rg", 10.0, 'resistor', int(index.flat[-1]), 0))
+    return elements
+
+
+def random_sparse(size, degree=3, seed=0):
+    """
+    Random graph on size nodes: a spanning tree (so nothing floats) plus extra
+    random edges up to the requested average degree.
+    """
+    rng = np.random.default_rng(seed)
+    elements = [element("V1", 1.0, 'voltage_source', 1, 0)]
+    for n in range(2, size + 1):
+        elements.append(element(f"Rt{n}", float(rng.uniform(1, 100)), 'resistor', n, int(rng.integers(1, n))))
+    for k in range(max(0, size * degree // 2 - size)):
+        n1, n2 = rng.integers(1, size + 1, 2).tolist()
+        if n1 != n2:
+            elements.append(element(f"Rx{k}", float(rng.uniform(1, 100)), 'resistor', n1, n2))
+    elements.append(element("Rg", 50.0, 'resistor', size, 0))
+    return elements
+
+
+def many_sources(size):
+    """
+    One voltage source and one current source per node of a resistor chain.
+    """
+    elements = []
+    for i in range(1, size + 1):
+        elements.append(element(f"V{i}", float(i % 7 + 1), 'voltage_source', 2 * i - 1, 0))
+        elements.append(element(f"R{i}", 10.0, 'resistor', 2 * i - 1, 2 * i))
+        elements.append(element(f"I{i}", 0.001, 'current_source', 0, 2 * i))
+        elements.append(element(f"Rl{i}", 1000.0, 'resistor', 2 * i, 0))
+    return elements
+
+
+def wire_chain(size):
+    """
+    Resistors with separate terminal nodes joined end to end by wires, so the
+    union-find has to merge a deep chain.
+    """
+    ground = {"element": None}
+    components = []
+    elements = [element("V1", 1.0, 'voltage_source', 1, 0)]
+    for i in range(size):
+        r = element(f"R{i}", 1.0, 'resistor', 2 * i + 2, 2 * i + 3)
+        components.append({"element": r})
+        elements.append(r)
+    source = {"element": elements[0]}
+    elements.append(Wire("W_in", source, 0, components[0], 0, 0))
+    for i in range(size - 1):
+        elements.append(Wire(f"W{i}", components[i], 1, components[i + 1], 0, 0))
+    elements.append(Wire("W_out", components[-1], 1, ground, 0, 0))
+    return elements
+
+
+FAMILIES = {
+    "ladder": (resistor_ladder, [100, 1000]),
+    "grid2d": (grid_2d, [10, 30]),
+    "grid3d": (grid_3d, [5, 10]),
+    "random": (random_sparse, [200, 1000]),
+    "sources": (many_sources, [50, 300]),
+    "wires": (wire_chain, [200, 2000]),
+}
+
+BACKENDS = {
+    "direct": {},
+    "reduced": {"reduce_network": True},
+    "iterative": {"solver": "iterative"},
+}
+
+
+def run_stages(elements, settings, profile_mode=None):
+    """
+    Solve on a fresh simulator (so no structure cache hits) and return the
+    per-phase SolveStats of the run as a dict, plus the solver error or None.
+    """
+    sim = CircuitSimulator()
+    for name, value in settings.items():
+        setattr(sim, name, value)
+    sim.profile_mode = profile_mode
+    sim.add_elements(elements)
+    node_voltages, _ = sim.solve_circuit(show_errors=False)
+    stats = sim.last_stats.as_dict()
+    stats["unknowns"] = sim.next_node_index + len(sim.voltage_sources)
+    return stats, None if node_voltages is not None else sim.last_error
+
+
+def aggregate(runs):
+    """
+    Best of N for every phase: the least noisy estimate of its cost.
+    """
+    stages = {}
+    for stats, _ in runs:
+        for name, entry in stats["stages"].items():
+            best = stages.setdefault(name, dict(entry))
+            best["seconds"] = min(best["seconds"], entry["seconds"])
+            if entry["peak_bytes"] is not None:
+                best["peak_bytes"] = max(best["peak_bytes"] or 0, entry["peak_bytes"])
+    return {"total": min(stats["total"] for stats, _ in runs), "unknowns": runs[0][0]["unknowns"], "stages": stages}
+
+
+def run(families, backends, repeat, profile_mode=None):
+    results = []
+    for family in families:
+        generator, sizes = FAMILIES[family]
+        for size in sizes:
+            for backend in backends:
+                runs = [run_stages(generator(size), BACKENDS[backend], profile_mode) for _ in range(repeat)]
+                best = aggregate(runs)
+                error = runs[0][1]
+                results.append({"family": family, "size": size, "backend": backend, "error": error, **best})
+                print(f"{family:8} {size:6} {backend:9} unknowns={best['unknowns']:7} total={best['total']:.4f}s"
+                      + (f"  FAILED: {error}" if error else ""), file=sys.stderr)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def import_time(module):
+    """
+    Cumulative import time of module in milliseconds, measured in a fresh
+    interpreter with -X importtime, and whether tkinter got imported with it.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, check=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    total, uses_tkinter = None, False
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not cumulative.isdigit():
+            continue
+        if name == module:
+            total = int(cumulative) / 1000
+        uses_tkinter = uses_tkinter or name == "tkinter"
+    return total, uses_tkinter
+
+
+def check_startup(budget_ms):
+    """
+    Enforce the cold-start budget of the headless entry (netlist loading plus
+    the solver), which must not pull in tkinter. The GUI import is reported
+    for reference. Returns the number of violations.
+    """
+    violations = 0
+    headless_ms, uses_tkinter = min((import_time("netlist_io") for _ in range(3)), key=lambda r: r[0])
+    print(f"headless import: {headless_ms:.1f} ms (budget {budget_ms:.0f} ms)", file=sys.stderr)
+    if headless_ms > budget_ms:
+        violations += 1
+        print(f"STARTUP headless import took {headless_ms:.1f} ms, over the {budget_ms:.0f} ms budget")
+    if uses_tkinter:
+        violations += 1
+        print("STARTUP headless import loads tkinter")
+    gui_ms, _ = import_time("circuit_gui")
+    print(f"GUI import: {gui_ms:.1f} ms", file=sys.stderr)
+    return violations
+
+
+def compare(results, baseline, threshold):
+    """
+    Print every stage that got slower than threshold x baseline, and every case
+    that newly fails; returns the count.
+    Stages under a millisecond are too noisy to compare and are skipped.
+    """
+    previous = {(r["family"], r["size"], r["backend"]): r for r in baseline["results"]}
+    regressions = 0
+    for r in results:
+        before = previous.get((r["family"], r["size"], r["backend"]))
+        if before is None:
+            continue
+        if r["error"] and not before.get("error"):
+            regressions += 1
+            print(f"REGRESSION {r['family']} {r['size']} {r['backend']}: now fails with {r['error']}")
+        old = {name: entry["seconds"] for name, entry in before["stages"].items()}
+        old["total"] = before["total"]
+        new = {name: entry["seconds"] for name, entry in r["stages"].items()}
+        new["total"] = r["total"]
+        for stage, seconds in new.items():
+            if stage not in old or max(seconds, old[stage]) < 1e-3:
+                continue
+            ratio = seconds / max(old[stage], 1e-9)
+            if ratio > threshold:
+                regressions += 1
+                print(f"REGRESSION {r['family']} {r['size']} {r['backend']} {stage}: "
+                      f"{old[stage]:.4f}s -> {seconds:.4f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each stage of the circuit solver on generated circuits.")
+    parser.add_argument("--family", action="append", choices=sorted(FAMILIES), help="circuit family (default: all)")
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS), help="solver backend (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest is kept")
+    parser.add_argument("--output", help="write JSON results to this file (default: stdout)")
+    parser.add_argument("--baseline", help="JSON from a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--profile", choices=["memory"], help="also record peak traced memory per phase")
+    parser.add_argument("--startup", action="store_true", help="only check the import-time startup budget")
+    parser.add_argument("--startup-budget", type=float, default=300.0, help="headless import budget in ms")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        return 1 if check_startup(args.startup_budget) else 0
+
+    # Keep the debug log (and its formatting) out of the measurements.
+    logging.disable(logging.CRITICAL)
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "results": run(args.family or list(FAMILIES), args.backend or list(BACKENDS), args.repeat,
+                       args.profile),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report["results"], json.load(f), args.threshold)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,39 @@
-from imports import *
 import logging
 
 class CircuitElement:
     """
     Represents a circuit element (resistor, voltage source, current source, wire).
+    Slotted to keep per-element memory small on large designs.
     """
+    __slots__ = ("name", "value", "element_type", "nodes", "element_id")
+
+    # Bumped whenever terminal node ids are merged or assigned (see nodes_changed),
+    # so Wire can cache its endpoint node ids between merges.
+    node_epoch = 0
+
     def __init__(self, name, value, element_type):
         self.name = name
         self.value = value
         self.element_type = element_type
         self.nodes = [None, None]
+        self.element_id = None  # assigned by CircuitSimulator.add_element
+
+    @staticmethod
+    def nodes_changed():
+        CircuitElement.node_epoch += 1
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for cls in type(self).__mro__
+                for name in getattr(cls, "__slots__", ()) if hasattr(self, name)}
+
+    def __setstate__(self, state):
+        # Also accepts the plain __dict__ state of circuits saved before slots were used.
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **(state[1] or {})}
+        for name, value in state.items():
+            setattr(self, name, value)
+        if not hasattr(self, "element_id"):
+            self.element_id = None
 
     def __repr__(self):
         return f"<{self.element_type} {self.name}, value={self.value}, nodes={self.nodes}>"
@@ -19,8 +43,12 @@ class Wire(CircuitElement):
     """
     Represents a wire connecting two terminals.
     Inherits from CircuitElement with element_type='wire' and value=0.
-    Wire nodes are computed dynamically from connected components.
+    Wire nodes come from the connected components' terminals; they are cached
+    and only looked up again after CircuitElement.nodes_changed().
     """
+    __slots__ = ("comp1", "term1_idx", "comp2", "term2_idx", "canvas_id",
+                 "voltage_arrows", "current_arrows", "cached_nodes", "cached_epoch")
+
     def __init__(self, name, comp1, term1_idx, comp2, term2_idx, canvas_id):
         super().__init__(name=name, value=0, element_type='wire')
         self.comp1 = comp1
@@ -30,15 +58,20 @@ class Wire(CircuitElement):
         self.canvas_id = canvas_id
         self.voltage_arrows = []
         self.current_arrows = []
+        self.cached_nodes = None
+        self.cached_epoch = -1
 
     @property
     def nodes(self):
-        """Compute wire nodes dynamically from connected components."""
-        eA = self.comp1.get('element')
-        eB = self.comp2.get('element')
-        nodeA = eA.nodes[self.term1_idx] if eA else 0
-        nodeB = eB.nodes[self.term2_idx] if eB else 0
-        return [nodeA, nodeB]
+        """Wire nodes from the connected components, recomputed only after a merge."""
+        if self.cached_epoch != CircuitElement.node_epoch:
+            eA = self.comp1.get('element')
+            eB = self.comp2.get('element')
+            nodeA = eA.nodes[self.term1_idx] if eA else 0
+            nodeB = eB.nodes[self.term2_idx] if eB else 0
+            self.cached_nodes = [nodeA, nodeB]
+            self.cached_epoch = CircuitElement.node_epoch
+        return self.cached_nodes
 
     @nodes.setter
     def nodes(self, value):
@@ -1,26 +1,44 @@
 from imports import *
 from circuit_simulator import CircuitSimulator
 from circuit_elements import CircuitElement, Wire
+from solver_worker import SolveWorker
+from design_model import DesignModel
+from netlist_io import iter_circuit_chunks, write_circuit
+import os
 import pickle
+import queue
+import time
 from tkinter import filedialog
 
 
 class TextHandler(logging.Handler):
     """
     This class allows logging to a Tkinter Text widget.
+    Records are queued and flushed from the Tk main loop, so logging from
+    the background solver thread never touches Tk directly.
     """
     def __init__(self, text_widget):
         super().__init__()
         self.text_widget = text_widget
+        self.pending = queue.Queue()
+        self.text_widget.after(100, self.flush)
 
     def emit(self, record):
-        msg = self.format(record)
-        def append():
+        self.pending.put(self.format(record))
+
+    def flush(self):
+        lines = []
+        while True:
+            try:
+                lines.append(self.pending.get_nowait())
+            except queue.Empty:
+                break
+        if lines:
             self.text_widget.configure(state='normal')
-            self.text_widget.insert(tk.END, msg + '\n')
+            self.text_widget.insert(tk.END, '\n'.join(lines) + '\n')
             self.text_widget.configure(state='disabled')
             self.text_widget.yview(tk.END)
-        self.text_widget.after(0, append)
+        self.text_widget.after(100, self.flush)
 
 
 class CircuitGUI(tk.Tk):
@@ -55,9 +73,13 @@ class CircuitGUI(tk.Tk):
 
         self.active_tool = tk.StringVar(value="select")
         self.snap_to_grid = tk.BooleanVar(value=False)
+        self.reduce_network = tk.BooleanVar(value=False)
+        self.iterative_solver = tk.BooleanVar(value=False)
+        self.use_result_cache = tk.BooleanVar(value=True)
         self.grid_size = 20
 
-        self.components = []
+        self.design = DesignModel()
+        self.component_by_element = {}  # element_id -> component dict
         self.wires = []
         self.comp_index = {"resistor": 0, "voltage_source": 0, "current_source": 0}
 
@@ -73,9 +95,21 @@ class CircuitGUI(tk.Tk):
         self.node_positions = {}
         self.node_labels = {}
 
+        # View transform: screen = world * zoom - view_offset.
+        self.zoom = 1.0
+        self.view_offset = (0.0, 0.0)
+        self.pan_start = None
+        self.viewport_refresh_pending = False
+        self.visual_refresh_pending = False
+
         self.component_voltage_arrows = {}
         self.component_current_arrows = {}
 
+        self.solve_worker = None
+        self.results_window = None
+        self.load_job = None
+        self.solve_status = tk.StringVar(value="Idle")
+
         self.build_left_ui()
 
 
@@ -83,21 +117,183 @@ class CircuitGUI(tk.Tk):
         self.canvas.bind("<ButtonRelease-1>", self.on_left_up)
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<Double-Button-1>", self.on_double_click)
+        self.canvas.bind("<ButtonPress-2>", self.on_pan_start)
+        self.canvas.bind("<B2-Motion>", self.on_pan)
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.zoom_at(1.2, e.x, e.y))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom_at(1 / 1.2, e.x, e.y))
+        self.canvas.bind("<Configure>", lambda e: self.schedule_viewport_refresh())
+        self.canvas.bind("<plus>", lambda e: self.zoom_at(1.2))
+        self.canvas.bind("<minus>", lambda e: self.zoom_at(1 / 1.2))
+        self.canvas.bind("<Key-0>", lambda e: self.reset_view())
 
         self.canvas.bind("<r>", lambda e: self.rotate_selected(90))
         self.canvas.bind("<Delete>", lambda e: self.delete_selected())
         self.canvas.bind("<Escape>", lambda e: self.cancel_actions())
         self.canvas.focus_set()
 
-    def rotate_points(self, points, angle_deg):
-        angle = math.radians(angle_deg)
-        cos_a, sin_a = math.cos(angle), math.sin(angle)
-        rotated = []
-        for (px, py) in points:
-            rx = px * cos_a - py * sin_a
-            ry = px * sin_a + py * cos_a
-            rotated.append((rx, ry))
-        return rotated
+    @property
+    def components(self):
+        return self.design.components
+
+    ZOOM_MIN = 0.02
+    ZOOM_MAX = 8.0
+    # Below these zoom factors labels/arrows are hidden, then components become glyphs.
+    LOD_LABELS_ZOOM = 0.6
+    LOD_GLYPH_ZOOM = 0.3
+    VIEW_MARGIN = 50
+    # Time spent reading chunks per main-loop tick while loading a file.
+    LOAD_TICK_SECONDS = 0.03
+
+    def world_to_screen(self, x, y):
+        return x * self.zoom - self.view_offset[0], y * self.zoom - self.view_offset[1]
+
+    def screen_to_world(self, sx, sy):
+        return (sx + self.view_offset[0]) / self.zoom, (sy + self.view_offset[1]) / self.zoom
+
+    def event_to_world(self, event):
+        return self.screen_to_world(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+
+    def world_item(self, kind, *coords, **options):
+        """
+        Create a canvas item of the given kind from world coordinates.
+        """
+        screen = []
+        for i in range(0, len(coords), 2):
+            screen.extend(self.world_to_screen(coords[i], coords[i + 1]))
+        return getattr(self.canvas, f"create_{kind}")(*screen, **options)
+
+    def detail_level(self):
+        if self.zoom < self.LOD_GLYPH_ZOOM:
+            return "glyph"
+        if self.zoom < self.LOD_LABELS_ZOOM:
+            return "shapes"
+        return "full"
+
+    def visible_world_rect(self):
+        margin = self.VIEW_MARGIN / self.zoom
+        x1, y1 = self.screen_to_world(self.canvas.canvasx(0), self.canvas.canvasy(0))
+        x2, y2 = self.screen_to_world(self.canvas.canvasx(self.canvas.winfo_width()),
+                                      self.canvas.canvasy(self.canvas.winfo_height()))
+        return x1 - margin, y1 - margin, x2 + margin, y2 + margin
+
+    def component_in_view(self, comp_dict, rect=None):
+        x1, y1, x2, y2 = rect or self.visible_world_rect()
+        cx, cy = self.design.center(comp_dict)
+        return x1 <= cx <= x2 and y1 <= cy <= y2
+
+    def wire_in_view(self, wire, rect=None):
+        x1, y1, x2, y2 = rect or self.visible_world_rect()
+        ax, ay = self.design.terminal(wire.comp1, wire.term1_idx)
+        bx, by = self.design.terminal(wire.comp2, wire.term2_idx)
+        return min(ax, bx) <= x2 and max(ax, bx) >= x1 and min(ay, by) <= y2 and max(ay, by) >= y1
+
+    def draw_wire(self, wire):
+        """
+        Create, move or cull the canvas line of a wire depending on the viewport.
+        """
+        if not self.wire_in_view(wire):
+            if wire.canvas_id is not None:
+                self.canvas.delete(wire.canvas_id)
+                wire.canvas_id = None
+            return
+        x1, y1 = self.world_to_screen(*self.design.terminal(wire.comp1, wire.term1_idx))
+        x2, y2 = self.world_to_screen(*self.design.terminal(wire.comp2, wire.term2_idx))
+        if wire.canvas_id is None:
+            wire.canvas_id = self.canvas.create_line(x1, y1, x2, y2, fill="#555555", width=2.5, capstyle=tk.ROUND)
+            self.canvas.tag_lower(wire.canvas_id)
+            if wire in self.selected_wires:
+                self.highlight_wire(wire, True)
+        else:
+            self.canvas.coords(wire.canvas_id, x1, y1, x2, y2)
+
+    def schedule_viewport_refresh(self):
+        if not self.viewport_refresh_pending:
+            self.viewport_refresh_pending = True
+            self.after(30, self.refresh_viewport)
+
+    def refresh_viewport(self):
+        """
+        Materialize components and wires that entered the viewport and delete
+        the canvas items of those that left it.
+        """
+        self.viewport_refresh_pending = False
+        rect = self.visible_world_rect()
+        visible = self.design.box_mask(*rect)
+        drawn = self.design.drawn[:len(visible)]
+        for row in np.flatnonzero(visible & ~drawn).tolist():
+            self.redraw_component(self.components[row])
+        for row in np.flatnonzero(~visible & drawn).tolist():
+            comp = self.components[row]
+            for it in comp['canvas_items']:
+                self.canvas.delete(it)
+            comp['canvas_items'].clear()
+            comp['terminal_dot_ids'] = []
+            drawn[row] = False
+        self.draw_wires(rect)
+        self.schedule_visual_refresh()
+
+    def draw_wires(self, rect):
+        """
+        Update the wires that are in view or still on the canvas, found with one
+        vectorized bounding-box test over the terminal columns.
+        """
+        if not self.wires:
+            return
+        ends = np.array([(w.comp1['row'], w.term1_idx, w.comp2['row'], w.term2_idx) for w in self.wires],
+                        dtype=np.int64)
+        on_canvas = np.fromiter((w.canvas_id is not None for w in self.wires), dtype=bool, count=len(self.wires))
+        for k in np.flatnonzero(on_canvas | self.design.segments_in_box(ends, *rect)).tolist():
+            self.draw_wire(self.wires[k])
+
+    def rematerialize_view(self):
+        for comp in self.components:
+            for it in comp['canvas_items']:
+                self.canvas.delete(it)
+            comp['canvas_items'].clear()
+            comp['terminal_dot_ids'] = []
+        self.design.drawn[:] = False
+        for w in self.wires:
+            self.canvas.delete(w.canvas_id)
+            w.canvas_id = None
+        self.refresh_viewport()
+
+    def zoom_at(self, factor, sx=None, sy=None):
+        """
+        Zoom by factor keeping the world point under screen position (sx, sy) fixed.
+        """
+        if sx is None:
+            sx, sy = self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2
+        sx, sy = self.canvas.canvasx(sx), self.canvas.canvasy(sy)
+        new_zoom = min(max(self.zoom * factor, self.ZOOM_MIN), self.ZOOM_MAX)
+        if new_zoom == self.zoom:
+            return
+        wx, wy = self.screen_to_world(sx, sy)
+        self.zoom = new_zoom
+        self.view_offset = (wx * new_zoom - sx, wy * new_zoom - sy)
+        self.rematerialize_view()
+        logging.debug(f"Zoom set to {self.zoom:.3f}")
+
+    def reset_view(self):
+        self.zoom = 1.0
+        self.view_offset = (0.0, 0.0)
+        self.rematerialize_view()
+
+    def on_mouse_wheel(self, event):
+        self.zoom_at(1.2 if event.delta > 0 else 1 / 1.2, event.x, event.y)
+
+    def on_pan_start(self, event):
+        self.pan_start = (event.x, event.y)
+
+    def on_pan(self, event):
+        if self.pan_start is None:
+            return
+        dx = event.x - self.pan_start[0]
+        dy = event.y - self.pan_start[1]
+        self.pan_start = (event.x, event.y)
+        self.view_offset = (self.view_offset[0] - dx, self.view_offset[1] - dy)
+        self.canvas.move("all", dx, dy)
+        self.schedule_viewport_refresh()
 
     def build_left_ui(self):
         ttk.Label(self.left_frame, text="Tools", font=("Arial", 12, "bold")).pack(pady=5)
@@ -127,6 +323,13 @@ class CircuitGUI(tk.Tk):
 
 
 
+        self.cancel_button = ttk.Button(self.left_frame, text="Cancel Simulation",
+                                        command=self.cancel_simulation, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.BOTTOM, fill=tk.X, pady=2)
+        self.solve_progress = ttk.Progressbar(self.left_frame, mode="indeterminate")
+        self.solve_progress.pack(side=tk.BOTTOM, fill=tk.X, pady=2)
+        ttk.Label(self.left_frame, textvariable=self.solve_status).pack(side=tk.BOTTOM, anchor="w")
+
         ttk.Button(self.left_frame, text="Simulate",
                    command=self.simulate).pack(side=tk.BOTTOM, fill=tk.X, pady=4)
 
@@ -137,6 +340,9 @@ class CircuitGUI(tk.Tk):
 
 
         ttk.Checkbutton(self.left_frame, text="Snap to Grid", variable=self.snap_to_grid).pack(side=tk.BOTTOM, padx=5, pady=5)
+        ttk.Checkbutton(self.left_frame, text="Reduce Network", variable=self.reduce_network).pack(side=tk.BOTTOM, padx=5, pady=5)
+        ttk.Checkbutton(self.left_frame, text="Iterative Solver", variable=self.iterative_solver).pack(side=tk.BOTTOM, padx=5, pady=5)
+        ttk.Checkbutton(self.left_frame, text="Use Result Cache", variable=self.use_result_cache).pack(side=tk.BOTTOM, padx=5, pady=5)
 
     def set_tool(self, tool):
         self.active_tool.set(tool)
@@ -146,22 +352,25 @@ class CircuitGUI(tk.Tk):
 
     def on_left_down(self, event):
         self.canvas.focus_set()
+        if self.loading_blocks():
+            return
         tool = self.active_tool.get()
-        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        sx, sy = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        x, y = self.screen_to_world(sx, sy)
 
         if tool in ["resistor", "voltage_source", "current_source", "ground"]:
             self.place_component(tool, x, y)
             return
 
         if tool == "wire":
-            self.handle_wire_click(x, y)
+            self.handle_wire_click(sx, sy)
             return
 
         if tool == "select":
-            clicked_items = self.canvas.find_overlapping(x-5, y-5, x+5, y+5)
+            clicked_items = self.canvas.find_overlapping(sx-5, sy-5, sx+5, sy+5)
             if not clicked_items:
                 self.clear_selection()
-                self.selection_box = self.canvas.create_rectangle(x, y, x, y, outline="blue", dash=(2, 2))
+                self.selection_box = self.canvas.create_rectangle(sx, sy, sx, sy, outline="blue", dash=(2, 2))
                 logging.debug("Started box selection")
                 return
 
@@ -211,43 +420,36 @@ class CircuitGUI(tk.Tk):
                     return
 
             self.clear_selection()
-            self.selection_box = self.canvas.create_rectangle(x, y, x, y, outline="blue", dash=(2, 2))
+            self.selection_box = self.canvas.create_rectangle(sx, sy, sx, sy, outline="blue", dash=(2, 2))
             logging.debug("Started box selection")
 
     def on_left_up(self, event):
         self.dragging = False
         if self.selection_box:
             x1, y1, x2, y2 = self.canvas.coords(self.selection_box)
+            x1, y1 = self.screen_to_world(x1, y1)
+            x2, y2 = self.screen_to_world(x2, y2)
             self.canvas.delete(self.selection_box)
             self.selection_box = None
             if x2 < x1:
                 x1, x2 = x2, x1
             if y2 < y1:
                 y1, y2 = y2, y1
-            for c in self.components:
-                cx, cy = c['center']
-                if x1 <= cx <= x2 and y1 <= cy <= y2:
-                    if c not in self.selected_components:
-                        self.selected_components.append(c)
-                        self.highlight_component(c, True)
-                        logging.debug(f"Selected component {c['element'].name if c['element'] else 'Ground'} via box selection")
+            for c in self.design.in_box(x1, y1, x2, y2):
+                if c not in self.selected_components:
+                    self.selected_components.append(c)
+                    self.highlight_component(c, True)
+                    logging.debug(f"Selected component {c['element'].name if c['element'] else 'Ground'} via box selection")
 
     def on_drag(self, event):
         if self.dragging and self.selected_components:
-            x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+            x, y = self.event_to_world(event)
             dx = x - self.last_mouse_pos[0]
             dy = y - self.last_mouse_pos[1]
             self.last_mouse_pos = (x, y)
+            self.design.move([comp['row'] for comp in self.selected_components], dx, dy,
+                             self.grid_size if self.snap_to_grid.get() else None)
             for comp in self.selected_components:
-                cx, cy = comp['center']
-                new_cx = cx + dx
-                new_cy = cy + dy
-                if self.snap_to_grid.get():
-                    new_cx = round(new_cx / self.grid_size) * self.grid_size
-                    new_cy = round(new_cy / self.grid_size) * self.grid_size
-                comp['center'] = (new_cx, new_cy)
-                rotated_terminals = self.rotate_points(comp['terminals'], comp['rotation'])
-                comp['abs_terminals'] = [(new_cx + tx, new_cy + ty) for tx, ty in rotated_terminals]
                 self.redraw_component(comp)
             self.update_wires()
             self.compute_node_positions()
@@ -256,8 +458,10 @@ class CircuitGUI(tk.Tk):
         """
         Optional fallback: double-click to edit a component’s value.
         """
-        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
-        clicked_item = self.canvas.find_closest(x, y)
+        if self.loading_blocks():
+            return
+        sx, sy = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        clicked_item = self.canvas.find_closest(sx, sy)
         if clicked_item:
             comp_dict = self.find_component_by_item(clicked_item[0])
             if comp_dict and comp_dict['element']:
@@ -271,8 +475,14 @@ class CircuitGUI(tk.Tk):
             self.selection_box = None
             logging.debug("Cancelled ongoing actions and cleared selection box")
 
+    def schedule_visual_refresh(self):
+        if not self.visual_refresh_pending:
+            self.visual_refresh_pending = True
+            self.after_idle(self.refresh_simulation_visuals)
+
     def refresh_simulation_visuals(self):
-        if not hasattr(self, "last_node_voltages") or not hasattr(self, "last_source_currents"):
+        self.visual_refresh_pending = False
+        if not hasattr(self, "last_results"):
             return
 
         for comp in self.components:
@@ -291,8 +501,8 @@ class CircuitGUI(tk.Tk):
                 self.canvas.delete(item_id)
             wire.current_arrows.clear()
 
-        self.visualize_component_potentials(self.last_node_voltages)
-        self.compute_and_display_currents(self.last_node_voltages, self.last_source_currents)
+        self.visualize_component_potentials(self.last_results)
+        self.compute_and_display_currents(self.last_results)
 
     def reset_simulation_state(self):
         logging.info("Resetting entire circuit - deleting ALL components, wires, arrows, and simulation data")
@@ -303,6 +513,8 @@ class CircuitGUI(tk.Tk):
             del self.last_node_map
         if hasattr(self, "last_source_currents"):
             del self.last_source_currents
+        if hasattr(self, "last_results"):
+            del self.last_results
 
         for label_id in self.node_labels.values():
             self.canvas.delete(label_id)
@@ -326,7 +538,8 @@ class CircuitGUI(tk.Tk):
             self.canvas.delete(wire.canvas_id)
             self.simulator.remove_element(wire)
 
-        self.components.clear()
+        self.design.clear()
+        self.component_by_element.clear()
         self.wires.clear()
         self.selected_components.clear()
         self.selected_wires.clear()
@@ -347,91 +560,173 @@ class CircuitGUI(tk.Tk):
 
     def save_circuit(self):
         """Save the current circuit state to a file."""
-        circuit_state = {
-            "components": [],
-            "wires": [],
-            "comp_index": self.comp_index
-        }
-        for comp in self.components:
-            comp_copy = { key: comp[key] for key in comp if key not in ["canvas_items", "terminal_dot_ids", "abs_terminals"] }
-            circuit_state["components"].append(comp_copy)
-        for wire in self.wires:
-            comp1_index = self.components.index(wire.comp1)
-            comp2_index = self.components.index(wire.comp2)
-            wire_copy = {
-                "name": wire.name,
-                "comp1_index": comp1_index,
-                "term1_idx": wire.term1_idx,
-                "comp2_index": comp2_index,
-                "term2_idx": wire.term2_idx
-            }
-            circuit_state["wires"].append(wire_copy)
+        if self.loading_blocks("save"):
+            return
+        wire_list = [{
+            "name": wire.name,
+            "comp1_index": wire.comp1['row'],
+            "term1_idx": wire.term1_idx,
+            "comp2_index": wire.comp2['row'],
+            "term2_idx": wire.term2_idx
+        } for wire in self.wires]
         file_path = filedialog.asksaveasfilename(defaultextension=".ckt", filetypes=[("Circuit Files", "*.ckt")])
         if file_path:
-            with open(file_path, "wb") as f:
-                pickle.dump(circuit_state, f)
+            write_circuit(file_path, self.design.to_state(), wire_list, self.comp_index)
             logging.info(f"Circuit saved to {file_path}")
 
+    def clear_circuit(self):
+        for comp in self.components:
+            for item in comp.get("canvas_items", []):
+                self.canvas.delete(item)
+        for wire in self.wires:
+            self.canvas.delete(wire.canvas_id)
+        self.simulator.clear_all()
+        self.design.clear()
+        self.component_by_element = {}
+        self.wires = []
+        self.selected_components = []
+        self.selected_wires = []
 
     def load_circuit(self):
-        """Load a saved circuit state from a file."""
+        """
+        Load a saved circuit. The file is read chunk by chunk from the Tk main
+        loop (load_next_chunk), so the window stays responsive and the load can
+        be cancelled; only the part of the design inside the viewport is drawn.
+        """
         file_path = filedialog.askopenfilename(filetypes=[("Circuit Files", "*.ckt")])
-        if file_path:
-            with open(file_path, "rb") as f:
-                circuit_state = pickle.load(f)
-            for comp in self.components:
-                for item in comp.get("canvas_items", []):
-                    self.canvas.delete(item)
-            for wire in self.wires:
-                self.canvas.delete(wire.canvas_id)
-            self.simulator.elements = []
-
-            self.components = []
-            self.wires = []
-            self.comp_index = circuit_state.get("comp_index", {"resistor": 0, "voltage_source": 0, "current_source": 0})
-
-            for comp_data in circuit_state["components"]:
-                comp = comp_data.copy()
-                comp["canvas_items"] = []
-                comp["terminal_dot_ids"] = []
-                self.components.append(comp)
-                self.redraw_component(comp)
-                if "element" in comp and comp["element"] is not None:
-                    self.simulator.add_element(comp["element"])
-
-            for wire_data in circuit_state["wires"]:
-                try:
-                    comp1 = self.components[wire_data["comp1_index"]]
-                    comp2 = self.components[wire_data["comp2_index"]]
-                except IndexError:
-                    logging.error("Error loading wire: component index out of range.")
-                    continue
-                try:
-                    x1, y1 = comp1["abs_terminals"][wire_data["term1_idx"]]
-                    x2, y2 = comp2["abs_terminals"][wire_data["term2_idx"]]
-                except (KeyError, IndexError):
-                    logging.error("Error loading wire: terminal index out of range.")
-                    continue
-                wire_id = self.canvas.create_line(x1, y1, x2, y2, fill="gray", width=2)
-                wire_element = Wire(
-                    name=wire_data["name"],
-                    comp1=comp1,
-                    term1_idx=wire_data["term1_idx"],
-                    comp2=comp2,
-                    term2_idx=wire_data["term2_idx"],
-                    canvas_id=wire_id
-                )
-
-                # Wire nodes are computed dynamically from connected components
-
-                self.simulator.add_element(wire_element)
-                self.wires.append(wire_element)
-            self.update_wires()
-            logging.info(f"Circuit loaded from {file_path}")
-
-
+        if not file_path:
+            return
+        self.cancel_load()
+        if self.solve_worker is not None:
+            self.solve_worker.cancel()
+            self.finish_solve("Cancelled")
+        self.clear_circuit()
+        # Saved component indices are relative to the first row this load adds.
+        self.load_job = {"path": file_path, "chunks": iter_circuit_chunks(file_path),
+                         "offset": len(self.design), "components": 0, "wires": 0, "total": 0}
+        self.solve_status.set("Loading...")
+        self.solve_progress.configure(mode="determinate", value=0)
+        self.cancel_button.configure(state=tk.NORMAL)
+        self.after_idle(self.load_next_chunk)
+
+    def load_next_chunk(self, drain=False):
+        """
+        Read chunks for one LOAD_TICK_SECONDS slice (all remaining chunks with
+        drain=True). Returns True once the load has finished, False if it failed
+        and None while chunks remain.
+        """
+        job = self.load_job
+        if job is None:
+            return
+        deadline = float("inf") if drain else time.perf_counter() + self.LOAD_TICK_SECONDS
+        try:
+            while time.perf_counter() < deadline:
+                chunk = next(job["chunks"], None)
+                if chunk is None:
+                    self.finish_load()
+                    return True
+                if "kind" not in chunk:
+                    job["total"] = max(1, chunk["components"] + chunk["wires"])
+                    self.comp_index = chunk.get("comp_index") or {"resistor": 0, "voltage_source": 0, "current_source": 0}
+                elif chunk["kind"] == "components":
+                    self.load_components(chunk)
+                else:
+                    self.load_wires(chunk["wires"])
+        except (OSError, EOFError, pickle.UnpicklingError, KeyError) as e:
+            logging.error(f"Error loading {job['path']}: {e}")
+            self.cancel_load()
+            self.clear_circuit()
+            messagebox.showerror("Load Error", f"Could not load {job['path']}: {e}")
+            return False
+        done = job["components"] + job["wires"]
+        self.solve_progress.configure(value=100 * done / max(1, job["total"]))
+        self.solve_status.set(f"Loading... {job['components']} components, {job['wires']} wires")
+        self.after(1, self.load_next_chunk)
+
+    def load_components(self, chunk):
+        records = self.design.extend(chunk["records"], chunk["centers"], chunk["rotations"],
+                                     chunk["terminal_offsets"])
+        self.simulator.add_elements([comp["element"] for comp in records if comp.get("element") is not None])
+        for comp in records:
+            comp["canvas_items"] = []
+            comp["terminal_dot_ids"] = []
+            if comp.get("element") is not None:
+                self.component_by_element[comp["element"].element_id] = comp
+        self.load_job["components"] += len(records)
+
+    def load_wires(self, wire_list):
+        job = self.load_job
+        wires = []
+        for wire_data in wire_list:
+            if not (0 <= wire_data["comp1_index"] < job["components"] and 0 <= wire_data["comp2_index"] < job["components"]):
+                logging.error("Error loading wire: component index out of range.")
+                continue
+            comp1 = self.components[job["offset"] + wire_data["comp1_index"]]
+            comp2 = self.components[job["offset"] + wire_data["comp2_index"]]
+            if not (0 <= wire_data["term1_idx"] < 2 and 0 <= wire_data["term2_idx"] < 2):
+                logging.error("Error loading wire: terminal index out of range.")
+                continue
+            wires.append(Wire(
+                name=wire_data["name"],
+                comp1=comp1,
+                term1_idx=wire_data["term1_idx"],
+                comp2=comp2,
+                term2_idx=wire_data["term2_idx"],
+                canvas_id=None
+            ))
+        self.simulator.add_elements(wires)
+        self.wires.extend(wires)
+        job["wires"] += len(wire_list)
+
+    def finish_load(self):
+        job = self.load_job
+        self.load_job = None
+        job["chunks"].close()
+        self.solve_progress.configure(mode="indeterminate", value=0)
+        self.cancel_button.configure(state=tk.DISABLED)
+        self.solve_status.set("Idle")
+        CircuitElement.nodes_changed()
+        self.refresh_viewport()
+        logging.info(f"Circuit loaded from {job['path']}: {job['components']} components, {job['wires']} wires")
+
+    def complete_load(self):
+        """
+        Read the rest of a load in progress at once so a solve can start on the
+        full netlist; only parsing is left, canvas items are created afterwards
+        for the viewport. Returns False if the load failed.
+        """
+        if self.load_job is None:
+            return True
+        self.solve_status.set("Reading the rest of the circuit...")
+        self.update_idletasks()
+        return self.load_next_chunk(drain=True)
 
+    def loading_blocks(self, action=None):
+        """
+        True while a file is loading: the netlist is incomplete, so edits are
+        ignored, and button actions (named by action) explain why.
+        """
+        if self.load_job is None:
+            return False
+        if action:
+            messagebox.showwarning("Loading", f"Cannot {action} while {os.path.basename(self.load_job['path'])} is loading.")
+        return True
 
+    def cancel_load(self):
+        """
+        Stop a load in progress and drop the partially built circuit.
+        """
+        job = self.load_job
+        if job is None:
+            return False
+        self.load_job = None
+        job["chunks"].close()
+        self.clear_circuit()
+        self.solve_progress.configure(mode="indeterminate", value=0)
+        self.cancel_button.configure(state=tk.DISABLED)
+        self.solve_status.set("Load cancelled")
+        logging.info(f"Loading {job['path']} cancelled.")
+        return True
 
     def find_wire_by_item(self, item_id):
         for w in self.wires:
@@ -440,6 +735,8 @@ class CircuitGUI(tk.Tk):
         return None
 
     def place_component(self, comp_type, x, y):
+        if self.loading_blocks():
+            return
         try:
             logging.debug(f"Placing component: {comp_type} at ({x}, {y})")
             if self.snap_to_grid.get():
@@ -455,33 +752,12 @@ class CircuitGUI(tk.Tk):
                 ground_symbol = {
                     "element": None,
                     "comp_type": "ground",
-                    "center": (x, y),
-                    "rotation": 0,
-                    "shape_points": [],
-                    "terminals": [(-10, 0), (10, 0)],
                     "canvas_items": [],
                     "is_ground": True
                 }
-                radius = 10
-                oval_id = self.canvas.create_oval(
-                    x - radius, y - radius, x + radius, y + radius,
-                    fill="black", outline="black"
-                )
-                ground_symbol['canvas_items'].append(oval_id)
-                abs_terminals = []
-                for tx, ty in ground_symbol["terminals"]:
-                    tid = self.canvas.create_oval(
-                        x + tx - 3, y + ty - 3, x + tx + 3, y + ty + 3,
-                        fill="red"
-                    )
-                    ground_symbol['canvas_items'].append(tid)
-                    abs_terminals.append((x + tx, y + ty))
-                ground_symbol['abs_terminals'] = abs_terminals
-                self.components.append(ground_symbol)
+                self.design.add(ground_symbol, (x, y))
+                self.redraw_component(ground_symbol)
                 logging.debug(f"Created ground with canvas IDs: {ground_symbol['canvas_items']}")
-                self.canvas.tag_raise(oval_id)
-                label_id = self.canvas.create_text(x, y + 20, text="Ground", fill="black", font=("Arial", 10, "bold"))
-                ground_symbol['canvas_items'].append(label_id)
                 return
 
             self.comp_index[comp_type] += 1
@@ -505,26 +781,13 @@ class CircuitGUI(tk.Tk):
             element = CircuitElement(elem_name, default_value, comp_type)
             self.simulator.add_element(element)
 
-            if comp_type == "resistor":
-                shape_points = [(-20, 0), (-10, -10), (0, 10), (10, -10), (20, 0)]
-            else:
-                shape_points = []
-
-            if comp_type == "voltage_source":
-                terminals = [(0, -25), (0, 25)]
-            else:
-                terminals = [(-25, 0), (25, 0)]
-
             comp_dict = {
                 "element": element,
                 "comp_type": comp_type,
-                "center": (x, y),
-                "rotation": 0,
-                "shape_points": shape_points,
-                "terminals": terminals,
                 "canvas_items": [],
             }
-            self.components.append(comp_dict)
+            self.design.add(comp_dict, (x, y))
+            self.component_by_element[element.element_id] = comp_dict
             self.redraw_component(comp_dict)
             logging.debug(f"Placed component: {comp_dict['element'].name}")
         except Exception as e:
@@ -533,105 +796,115 @@ class CircuitGUI(tk.Tk):
 
 
     def redraw_component(self, comp_dict):
+        """
+        Recompute the component's terminal positions and (re)create its canvas items.
+        Components outside the viewport are left unmaterialized, and the level of
+        detail follows the zoom: labels are dropped when zoomed out and, further out,
+        each component becomes a single glyph.
+        """
         for it in comp_dict['canvas_items']:
             self.canvas.delete(it)
         comp_dict['canvas_items'].clear()
+        comp_dict['terminal_dot_ids'] = []
+        self.design.drawn[comp_dict['row']] = False
 
-        cx, cy = comp_dict['center']
-        rot = comp_dict['rotation']
-        r_shape = self.rotate_points(comp_dict['shape_points'], rot)
-        abs_shape = [(cx + px, cy + py) for px, py in r_shape]
+        cx, cy = self.design.center(comp_dict)
+        rot = self.design.rotation(comp_dict)
+        ctype = comp_dict['comp_type']
+        terminals = self.design.terminals(comp_dict)
 
-        t_points = self.rotate_points(comp_dict['terminals'], rot)
-        abs_terminals = [(cx + px, cy + py) for px, py in t_points]
-        comp_dict['abs_terminals'] = abs_terminals
+        self.schedule_visual_refresh()
+        if not self.component_in_view(comp_dict):
+            return
 
-        ctype = comp_dict['comp_type']
+        detail = self.detail_level()
+        show_labels = detail == "full"
 
-        if ctype == "ground":
+        if detail == "glyph":
+            if ctype == "resistor":
+                (x1, y1), (x2, y2) = terminals
+                item_id = self.world_item("line", x1, y1, x2, y2, width=2, fill="black")
+            else:
+                r = 8
+                colors = {"ground": "black", "voltage_source": "blue", "current_source": "green"}
+                item_id = self.world_item("oval", cx - r, cy - r, cx + r, cy + r, width=2,
+                                          outline=colors[ctype], fill="black" if ctype == "ground" else "white")
+            comp_dict['canvas_items'].append(item_id)
+        elif ctype == "ground":
             radius = 10
-            oval_id = self.canvas.create_oval(
+            oval_id = self.world_item("oval",
                 cx - radius, cy - radius, cx + radius, cy + radius,
                 fill="black", outline="black"
             )
             comp_dict['canvas_items'].append(oval_id)
-            abs_terminals = []
-            for tx, ty in comp_dict["terminals"]:
-                tid = self.canvas.create_oval(
-                    cx + tx - 3, cy + ty - 3, cx + tx + 3, cy + ty + 3,
-                    fill="red"
-                )
+            for tx, ty in terminals:
+                tid = self.world_item("oval", tx - 3, ty - 3, tx + 3, ty + 3, fill="red")
                 comp_dict['canvas_items'].append(tid)
-                abs_terminals.append((cx + tx, cy + ty))
-            comp_dict['abs_terminals'] = abs_terminals
             self.canvas.tag_raise(oval_id)
-            label_id = self.canvas.create_text(cx, cy + 20, text="Ground", fill="black", font=("Arial", 10, "bold"))
-            comp_dict['canvas_items'].append(label_id)
-            return
-
-        if ctype == "resistor":
-            coords = []
-            for p in abs_shape:
-                coords.extend(p)
-            item_id = self.canvas.create_line(*coords, width=2, fill="black")
-            comp_dict['canvas_items'].append(item_id)
-
-            angle_rad = math.radians(rot)
-            label_offset = 25
-            offset_x = -label_offset * math.sin(angle_rad)
-            offset_y = label_offset * math.cos(angle_rad)
-
-            label_x = cx + offset_x
-            label_y = cy + offset_y
-            label_id = self.canvas.create_text(label_x, label_y, text=f"{comp_dict['element'].name}\n{comp_dict['element'].value}Ω", fill="black", font=("Arial", 9), anchor="center")
-            comp_dict['canvas_items'].append(label_id)
-        elif ctype == "voltage_source":
-            r = 20
-            item_id = self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, width=2, outline="blue", fill="white")
-            comp_dict['canvas_items'].append(item_id)
-
-            angle_rad = math.radians(rot)
-            label_offset = 35
-            offset_x = label_offset * math.cos(angle_rad)
-            offset_y = label_offset * math.sin(angle_rad)
-
-            label_x = cx + offset_x
-            label_y = cy + offset_y
-            label_id = self.canvas.create_text(label_x, label_y, text=f"{comp_dict['element'].name}\n{comp_dict['element'].value}V", fill="blue", font=("Arial", 9, "bold"), anchor="center")
-            comp_dict['canvas_items'].append(label_id)
-        elif ctype == "current_source":
-            r = 20
-            item_id = self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, width=2, outline="green", fill="white")
-            comp_dict['canvas_items'].append(item_id)
-            arrow_id = self.canvas.create_line(cx - 5, cy + 10, cx - 5, cy - 10, arrow=tk.LAST, fill="green", width=2)
-            comp_dict['canvas_items'].append(arrow_id)
-
-            angle_rad = math.radians(rot)
-            label_offset = 35
-            offset_x = label_offset * math.cos(angle_rad)
-            offset_y = label_offset * math.sin(angle_rad)
-
-            label_x = cx + offset_x
-            label_y = cy + offset_y
-            label_id = self.canvas.create_text(label_x, label_y, text=f"{comp_dict['element'].name}\n{comp_dict['element'].value}A", fill="green", font=("Arial", 9, "bold"), anchor="center")
-            comp_dict['canvas_items'].append(label_id)
-
-
-
-        comp_dict['terminal_dot_ids'] = []
-        for tx, ty in comp_dict['abs_terminals']:
-            tid = self.canvas.create_oval(tx - 4, ty - 4, tx + 4, ty + 4, fill="red", outline="darkred", width=1)
-            comp_dict['terminal_dot_ids'].append(tid)
-            comp_dict['canvas_items'].append(tid)
-
-
+            if show_labels:
+                label_id = self.world_item("text", cx, cy + 20, text="Ground", fill="black", font=("Arial", 10, "bold"))
+                comp_dict['canvas_items'].append(label_id)
+        else:
+            if ctype == "resistor":
+                coords = [c for point in self.design.shape(comp_dict) for c in point]
+                item_id = self.world_item("line", *coords, width=2, fill="black")
+                comp_dict['canvas_items'].append(item_id)
+
+                angle_rad = math.radians(rot)
+                label_offset = 25
+                offset_x = -label_offset * math.sin(angle_rad)
+                offset_y = label_offset * math.cos(angle_rad)
+
+                label_x = cx + offset_x
+                label_y = cy + offset_y
+                if show_labels:
+                    label_id = self.world_item("text", label_x, label_y, text=f"{comp_dict['element'].name}\n{comp_dict['element'].value}Ω", fill="black", font=("Arial", 9), anchor="center")
+                    comp_dict['canvas_items'].append(label_id)
+            elif ctype == "voltage_source":
+                r = 20
+                item_id = self.world_item("oval", cx - r, cy - r, cx + r, cy + r, width=2, outline="blue", fill="white")
+                comp_dict['canvas_items'].append(item_id)
+
+                angle_rad = math.radians(rot)
+                label_offset = 35
+                offset_x = label_offset * math.cos(angle_rad)
+                offset_y = label_offset * math.sin(angle_rad)
+
+                label_x = cx + offset_x
+                label_y = cy + offset_y
+                if show_labels:
+                    label_id = self.world_item("text", label_x, label_y, text=f"{comp_dict['element'].name}\n{comp_dict['element'].value}V", fill="blue", font=("Arial", 9, "bold"), anchor="center")
+                    comp_dict['canvas_items'].append(label_id)
+            elif ctype == "current_source":
+                r = 20
+                item_id = self.world_item("oval", cx - r, cy - r, cx + r, cy + r, width=2, outline="green", fill="white")
+                comp_dict['canvas_items'].append(item_id)
+                arrow_id = self.world_item("line", cx - 5, cy + 10, cx - 5, cy - 10, arrow=tk.LAST, fill="green", width=2)
+                comp_dict['canvas_items'].append(arrow_id)
+
+                angle_rad = math.radians(rot)
+                label_offset = 35
+                offset_x = label_offset * math.cos(angle_rad)
+                offset_y = label_offset * math.sin(angle_rad)
+
+                label_x = cx + offset_x
+                label_y = cy + offset_y
+                if show_labels:
+                    label_id = self.world_item("text", label_x, label_y, text=f"{comp_dict['element'].name}\n{comp_dict['element'].value}A", fill="green", font=("Arial", 9, "bold"), anchor="center")
+                    comp_dict['canvas_items'].append(label_id)
+
+            for tx, ty in terminals:
+                tid = self.world_item("oval", tx - 4, ty - 4, tx + 4, ty + 4, fill="red", outline="darkred", width=1, tags=("terminal",))
+                comp_dict['terminal_dot_ids'].append(tid)
+                comp_dict['canvas_items'].append(tid)
 
+        self.design.drawn[comp_dict['row']] = True
         if comp_dict in self.selected_components:
             self.highlight_component(comp_dict, True)
 
-        self.after_idle(self.refresh_simulation_visuals)
-
     def edit_component_value(self, comp_dict):
+        if self.loading_blocks():
+            return
         elem = comp_dict['element']
         unit = {'resistor': 'Ω', 'voltage_source': 'V', 'current_source': 'A'}.get(elem.element_type, '')
         new_val = simpledialog.askfloat(
@@ -645,21 +918,23 @@ class CircuitGUI(tk.Tk):
                 logging.error(f"Attempted to set negative/zero resistance for {elem.name}")
                 return
             elem.value = new_val
+            self.simulator.mark_modified()
             logging.debug(f"Updated {elem.name} to new value: {new_val}")
             self.redraw_component(comp_dict)
 
     def rotate_selected(self, angle_deg):
+        if self.loading_blocks():
+            return
+        self.design.rotate_rows([c['row'] for c in self.selected_components], angle_deg)
         for c in self.selected_components:
-            c['rotation'] = (c['rotation'] + angle_deg) % 360
-            cx, cy = c['center']
-            rotated_terminals = self.rotate_points(c['terminals'], c['rotation'])
-            c['abs_terminals'] = [(cx + tx, cy + ty) for tx, ty in rotated_terminals]
             self.redraw_component(c)
             logging.debug(f"Rotated component {c['element'].name if c['element'] else 'Ground'} by {angle_deg}°")
         self.update_wires()
         self.compute_node_positions()
 
     def delete_selected(self):
+        if self.loading_blocks():
+            return
         if self.selected_components:
             for c in self.selected_components:
                 if c['element']:
@@ -677,8 +952,10 @@ class CircuitGUI(tk.Tk):
                 for wr in wires_to_remove:
                     self.wires.remove(wr)
                     self.simulator.remove_element(wr)
-                if c in self.components:
-                    self.components.remove(c)
+                if c['row'] is not None:
+                    self.design.remove(c)
+                    if c['element']:
+                        self.component_by_element.pop(c['element'].element_id, None)
                     logging.debug(f"Deleted component {c['element'].name if c.get('element') else 'Ground'}")
             self.selected_components.clear()
             self.compute_node_positions()
@@ -702,15 +979,10 @@ class CircuitGUI(tk.Tk):
         Bind the terminal dots (red ovals) so that clicking them shows the node voltage.
         This is only activated after a simulation has been run.
         """
-        for comp in self.components:
-            if not comp.get("element"):
-                continue
-            if "terminal_dot_ids" in comp:
-                for tid in comp["terminal_dot_ids"]:
-                    self.canvas.tag_bind(tid, "<Button-1>", self.terminal_click, add="+")
+        self.canvas.tag_bind("terminal", "<Button-1>", self.terminal_click)
 
-    def handle_wire_click(self, x, y):
-        item_ids = self.canvas.find_overlapping(x-3, y-3, x+3, y+3)
+    def handle_wire_click(self, sx, sy):
+        item_ids = self.canvas.find_overlapping(sx-3, sy-3, sx+3, sy+3)
         if not item_ids:
             self.wire_start = None
             logging.debug("Clicked on empty space; resetting wire start")
@@ -758,49 +1030,28 @@ class CircuitGUI(tk.Tk):
         nodeA = eA.nodes[termA] if eA else 0
         nodeB = eB.nodes[termB] if eB else 0
 
+        registry = self.simulator.node_registry
         if nodeA is None and nodeB is None:
-            new_node = self.get_biggest_node() + 1
+            new_node = registry.new_node()
             if eA:
-                eA.nodes[termA] = new_node
+                registry.assign(eA, termA, new_node)
             if eB:
-                eB.nodes[termB] = new_node
-
+                registry.assign(eB, termB, new_node)
         elif nodeA is None:
             if eA:
-                eA.nodes[termA] = nodeB
+                registry.assign(eA, termA, nodeB)
         elif nodeB is None:
             if eB:
-                eB.nodes[termB] = nodeA
-
-        else:
-            if nodeA != nodeB:
-                # Always merge into ground (0) if one node is ground
-                if nodeA == 0:
-                    for e in self.simulator.elements:
-                        for i, n in enumerate(e.nodes):
-                            if n == nodeB:
-                                e.nodes[i] = 0
-                    logging.debug(f"Merged node {nodeB} into ground")
-                elif nodeB == 0:
-                    for e in self.simulator.elements:
-                        for i, n in enumerate(e.nodes):
-                            if n == nodeA:
-                                e.nodes[i] = 0
-                    logging.debug(f"Merged node {nodeA} into ground")
-                else:
-                    # Normal merge: merge nodeB into nodeA
-                    for e in self.simulator.elements:
-                        for i, n in enumerate(e.nodes):
-                            if n == nodeB:
-                                e.nodes[i] = nodeA
-                    logging.debug(f"Merged node {nodeB} into node {nodeA}")
-
-        x1, y1 = compA['abs_terminals'][termA]
-        x2, y2 = compB['abs_terminals'][termB]
-        wire_id = self.canvas.create_line(x1, y1, x2, y2, fill="#555555", width=2.5, capstyle=tk.ROUND)
+                registry.assign(eB, termB, nodeA)
+        elif nodeA != nodeB:
+            # Ground always survives; otherwise the node with fewer terminals is relabelled.
+            kept = registry.merge(nodeA, nodeB)
+            logging.debug(f"Merged node {nodeB if kept == nodeA else nodeA} into node {kept}")
+        self.simulator.mark_modified()
 
-        wire_name = f"Wire{len([e for e in self.simulator.elements if e.element_type == 'wire']) + 1}"
-        wire_element = Wire(name=wire_name, comp1=compA, term1_idx=termA, comp2=compB, term2_idx=termB, canvas_id=wire_id)
+        wire_name = f"Wire{len(self.wires) + 1}"
+        wire_element = Wire(name=wire_name, comp1=compA, term1_idx=termA, comp2=compB, term2_idx=termB, canvas_id=None)
+        self.draw_wire(wire_element)
 
         # Wire nodes are now computed dynamically from connected components
 
@@ -814,32 +1065,18 @@ class CircuitGUI(tk.Tk):
         """
         for c in self.components:
             if item_id in c['canvas_items']:
-                abs_terminals = c.get('abs_terminals', [])
-                for i, (tx, ty) in enumerate(abs_terminals):
+                for i, (tx, ty) in enumerate(self.design.terminals(c)):
                     coords = self.canvas.coords(item_id)
                     if len(coords) == 4:
-                        ix = (coords[0] + coords[2]) / 2
-                        iy = (coords[1] + coords[3]) / 2
+                        ix, iy = self.screen_to_world((coords[0] + coords[2]) / 2, (coords[1] + coords[3]) / 2)
                         if math.hypot(ix - tx, iy - ty) < 5:
                             return (c, i)
         return (None, None)
 
-    def get_biggest_node(self):
-        maxn = 0
-        for e in self.simulator.elements:
-            for nd in e.nodes:
-                if nd and nd > maxn:
-                    maxn = nd
-        logging.debug(f"Biggest node found: {maxn}")
-        return maxn
-
     def update_wires(self):
-        for w in self.wires:
-            x1, y1 = w.comp1['abs_terminals'][w.term1_idx]
-            x2, y2 = w.comp2['abs_terminals'][w.term2_idx]
-            self.canvas.coords(w.canvas_id, x1, y1, x2, y2)
+        self.draw_wires(self.visible_world_rect())
         self.compute_node_positions()
-        self.after_idle(self.refresh_simulation_visuals)
+        self.schedule_visual_refresh()
 
     def clear_selection(self):
         for c in self.selected_components:
@@ -877,6 +1114,8 @@ class CircuitGUI(tk.Tk):
             logging.debug(f"Unhighlighted component {comp_dict.get('element').name if comp_dict.get('element') else 'Ground'}")
 
     def highlight_wire(self, wire_obj, highlight):
+        if wire_obj.canvas_id is None:
+            return
         if highlight:
             self.canvas.itemconfig(wire_obj.canvas_id, fill="blue", width=4)
             logging.debug(f"Highlighted wire {wire_obj}")
@@ -920,6 +1159,8 @@ class CircuitGUI(tk.Tk):
 
 
     def simulate(self):
+        if not self.complete_load():
+            return
         self.clear_component_arrows()
 
         if not self.simulator.elements:
@@ -948,75 +1189,102 @@ class CircuitGUI(tk.Tk):
             logging.error("Simulation failed: No ground connection detected.")
             return
 
-        node_voltages, source_currents = self.simulator.solve_circuit()
-        if node_voltages is None:
-            logging.error("Simulation failed: Singular matrix encountered.")
+        if self.solve_worker is not None:
+            self.solve_worker.cancel()
+        self.simulator.reduce_network = self.reduce_network.get()
+        self.simulator.solver = "iterative" if self.iterative_solver.get() else "direct"
+        self.simulator.use_result_cache = self.use_result_cache.get()
+        if self.simulator.use_result_cache and self.simulator.result_cache is None:
+            self.open_result_cache()
+        worker = SolveWorker(self.simulator)
+        self.solve_worker = worker
+        worker.start()
+        self.solve_status.set("Solving...")
+        self.solve_progress.start(10)
+        self.cancel_button.configure(state=tk.NORMAL)
+        self.after(50, self.poll_solve_worker, worker)
+
+    def open_result_cache(self):
+        """
+        Create the on-disk result cache on first use rather than at startup.
+        """
+        from result_cache import ResultCache
+        try:
+            self.simulator.result_cache = ResultCache(os.path.join(os.path.expanduser("~"), ".circuit_simulator", "results"))
+        except OSError as e:
+            self.use_result_cache.set(False)
+            self.simulator.use_result_cache = False
+            logging.error(f"Result cache disabled: {e}")
+
+    def cancel_simulation(self):
+        if self.cancel_load():
             return
+        if self.solve_worker is not None:
+            self.solve_worker.cancel()
+            self.solve_status.set("Cancelling...")
+
+    def finish_solve(self, status):
+        self.solve_worker = None
+        if self.load_job is not None:
+            # The progress bar and Cancel button belong to the load now.
+            return
+        self.solve_progress.stop()
+        self.cancel_button.configure(state=tk.DISABLED)
+        self.solve_status.set(status)
 
+    def poll_solve_worker(self, worker):
+        """
+        Drain the worker's queue from the Tk main loop and apply its outcome.
+        Results from superseded workers, or for a netlist that changed while
+        solving, are discarded.
+        """
+        for kind, payload in worker.drain():
+            if worker is not self.solve_worker:
+                return
+            if kind == "progress":
+                self.solve_status.set(payload)
+                continue
+            if kind == "cancelled":
+                logging.info("Simulation cancelled.")
+                self.finish_solve("Cancelled")
+            elif kind == "error":
+                self.finish_solve("Failed")
+                messagebox.showerror("Simulation Error", payload)
+            elif worker.revision != self.simulator.revision:
+                logging.warning("Circuit changed while solving; discarding stale result.")
+                self.finish_solve("Discarded stale result")
+            else:
+                node_voltages, source_currents = payload
+                if node_voltages is None:
+                    self.finish_solve("Failed")
+                    logging.error("Simulation failed: Singular matrix encountered.")
+                    if worker.simulator.last_error:
+                        messagebox.showerror("Simulation Error", worker.simulator.last_error)
+                    return
+                self.simulator.adopt_solution(worker.simulator)
+                self.finish_solve("Done")
+                self.show_simulation_results(node_voltages, source_currents)
+            return
+        if worker is self.solve_worker:
+            self.after(50, self.poll_solve_worker, worker)
 
+    def show_simulation_results(self, node_voltages, source_currents):
         self.last_node_voltages = node_voltages
         self.last_node_map = self.simulator.node_map.copy()
         self.last_source_currents = source_currents
+        self.last_results = self.simulator.compute_element_results(node_voltages, source_currents)
         self.update_terminal_bindings()
 
 
         self.compute_node_positions()
 
-        self.visualize_component_potentials(node_voltages)
-        self.compute_and_display_currents(node_voltages, source_currents)
-
-
-        results_win = tk.Toplevel(self)
-        results_win.title("Simulation Results")
-        text = tk.Text(results_win, width=60, height=25)
-        text.pack()
-
-        text.insert(tk.END, "== Node Voltages ==\n")
-        for node_id, idx in self.simulator.node_map.items():
-            voltage = node_voltages[idx]
-            text.insert(tk.END, f"Node {node_id}: {voltage:.7f} V\n")
-
-        text.insert(tk.END, "\n== Elements ==\n")
-        for e in self.simulator.elements:
-            if e.element_type == 'wire':
-                continue
-
-            if e.element_type in ['resistor', 'voltage_source', 'current_source']:
-                node1 = e.nodes[0]
-                node2 = e.nodes[1]
-                v1 = 0.0 if node1 == 0 else node_voltages[self.simulator.node_map[node1]]
-                v2 = 0.0 if node2 == 0 else node_voltages[self.simulator.node_map[node2]]
-                voltage_diff = v1 - v2
-
-                current_val = None
-                for comp in self.components:
-                    if comp.get("element") == e and "current" in comp:
-                        current_val = comp["current"]
-                        break
-                if current_val is not None:
-                    current_str = f", I={current_val:.2e} A"
-                else:
-                    current_str = ""
-
-                text.insert(tk.END,
-                    f"{e.name} ({e.element_type}) - nodes={e.nodes}, value={e.value}, V={voltage_diff:.7f} V{current_str}\n")
-            else:
-                text.insert(tk.END, f"{e.name} ({e.element_type}) - nodes={e.nodes}, value={e.value}\n")
-
+        self.visualize_component_potentials(self.last_results)
+        self.compute_and_display_currents(self.last_results)
 
-        vsrcs = self.simulator.voltage_sources
-        if len(vsrcs) > 0:
-            text.insert(tk.END, "\n== Voltage Source Currents ==\n")
-            for i, vs in enumerate(vsrcs):
-                vs_index = next((idx for idx, source in enumerate(vsrcs) if source is vs), None)
-                if vs_index is not None and vs_index < len(source_currents):
-                    current = source_currents[vs_index]
-                    text.insert(tk.END, f"{vs.name} current: {current:.7e} A\n")
-                else:
-                    text.insert(tk.END, f"{vs.name} current: N/A\n")
-                    logging.error(f"Voltage Source {vs.name}: Simulation did not return a current value.")
-
-        text.config(state=tk.DISABLED)
+        from results_window import ResultsWindow
+        if self.results_window is not None and self.results_window.winfo_exists():
+            self.results_window.destroy()
+        self.results_window = ResultsWindow(self, self.last_results)
         logging.debug("Simulation completed successfully.")
 
     def visualize_voltage_differences(self, node_voltages):
@@ -1029,8 +1297,7 @@ class CircuitGUI(tk.Tk):
             w.voltage_arrows.clear()
 
         for w in self.wires:
-            node1 = w.comp1['element'].nodes[w.term1_idx] if w.comp1.get('element') else 0
-            node2 = w.comp2['element'].nodes[w.term2_idx] if w.comp2.get('element') else 0
+            node1, node2 = w.nodes
             v1 = 0.0 if node1 == 0 else node_voltages[self.simulator.node_map[node1]]
             v2 = 0.0 if node2 == 0 else node_voltages[self.simulator.node_map[node2]]
             voltage_diff = v1 - v2
@@ -1039,11 +1306,11 @@ class CircuitGUI(tk.Tk):
                 continue
 
             if voltage_diff > 0:
-                start = w.comp1['abs_terminals'][w.term1_idx]
-                end = w.comp2['abs_terminals'][w.term2_idx]
+                start = self.design.terminal(w.comp1, w.term1_idx)
+                end = self.design.terminal(w.comp2, w.term2_idx)
             else:
-                start = w.comp2['abs_terminals'][w.term2_idx]
-                end = w.comp1['abs_terminals'][w.term1_idx]
+                start = self.design.terminal(w.comp2, w.term2_idx)
+                end = self.design.terminal(w.comp1, w.term1_idx)
             arrow_color = "red" if voltage_diff > 0 else "blue"
             arrow_ids = self.draw_arrow_with_label(start, end, arrow_color, 2, 30, "{:.2f} V", abs(voltage_diff))
             w.voltage_arrows.extend(arrow_ids)
@@ -1054,28 +1321,34 @@ class CircuitGUI(tk.Tk):
             node_idx = self.simulator.node_map.get(node_id)
             if node_idx is not None:
                 voltage = node_voltages[node_idx]
-                self.canvas.create_text(pos[0], pos[1] - 20,
+                self.world_item("text", pos[0], pos[1] - 20,
                                         text=f"{voltage:.2f} V",
                                         fill="black", font=("Arial", 10, "bold"))
                 logging.debug(f"Displayed voltage {voltage:.2f} V at node {node_id}")
 
 
-    def visualize_component_potentials(self, node_voltages):
+    def visualize_component_potentials(self, results):
+        """
+        Draw potential arrows from the branch voltages in compute_element_results().
+        """
+        if self.detail_level() != "full":
+            return
+        position = results["position"]
+        voltages = results["voltages"]
         for comp in self.components:
+            if not comp['canvas_items']:
+                continue
             if comp.get("element") and comp["element"].element_type != "wire":
-                node1 = comp["element"].nodes[0]
-                node2 = comp["element"].nodes[1]
-                v1 = 0.0 if node1 == 0 else node_voltages[self.simulator.node_map[node1]]
-                v2 = 0.0 if node2 == 0 else node_voltages[self.simulator.node_map[node2]]
-                voltage_diff = v1 - v2
+                k = position.get(comp["element"].element_id)
+                if k is None:
+                    continue
+                voltage_diff = voltages[k]
                 if abs(voltage_diff) < 1e-6:
                     continue
                 if voltage_diff > 0:
-                    start = comp["abs_terminals"][0]
-                    end = comp["abs_terminals"][1]
+                    start, end = self.design.terminals(comp)
                 else:
-                    start = comp["abs_terminals"][1]
-                    end = comp["abs_terminals"][0]
+                    end, start = self.design.terminals(comp)
                 arrow_color = "purple"
                 arrow_ids = self.draw_arrow_with_label(start, end, arrow_color, 1.5, 40, "{:.2f}V", abs(voltage_diff), offset_distance=50, is_voltage=True)
                 comp.setdefault("voltage_arrows", []).extend(arrow_ids)
@@ -1084,51 +1357,39 @@ class CircuitGUI(tk.Tk):
 
 
 
-    def compute_and_display_currents(self, node_voltages, source_currents):
+    def compute_and_display_currents(self, results):
+        """
+        Draw current arrows from the branch currents in compute_element_results().
+        """
         self.clear_component_arrows()
 
+        position = results["position"]
+        currents = results["currents"]
         for comp in self.components:
             if not comp.get('element'):
                 continue
 
             elem = comp['element']
-
-            if elem.element_type == 'wire':
+            k = position.get(elem.element_id)
+            if k is None or elem.element_type == 'wire':
                 continue
 
-            else:
+            current = currents[k]
+            if np.isnan(current):
                 if elem.element_type == 'resistor':
-                    if elem.value == 0:
-                        logging.error(f"Resistor {elem.name} has zero resistance. Cannot calculate current.")
-                        continue
-                    node1, node2 = elem.nodes[0], elem.nodes[1]
-                    v1 = 0.0 if node1 == 0 else node_voltages[self.simulator.node_map[node1]]
-                    v2 = 0.0 if node2 == 0 else node_voltages[self.simulator.node_map[node2]]
-                    current = (v1 - v2) / elem.value
-                elif elem.element_type == 'voltage_source':
-                    vs_index = next((i for i, vs in enumerate(self.simulator.voltage_sources) if vs is elem), None)
-                    if vs_index is not None and vs_index < len(source_currents):
-                        current = source_currents[vs_index]
-                    else:
-                        current = 0.0
-                        logging.error(f"Voltage Source {elem.name}: Simulation did not return a current value.")
-                elif elem.element_type == 'current_source':
-                    current = elem.value
-                else:
-                    continue
+                    logging.error(f"Resistor {elem.name} has zero resistance. Cannot calculate current.")
+                continue
 
             comp['current'] = current
 
-            if abs(current) < 1e-12:
+            if abs(current) < 1e-12 or not comp['canvas_items'] or self.detail_level() != "full":
                 continue
 
             if current > 0:
-                start_pos = comp['abs_terminals'][0]
-                end_pos = comp['abs_terminals'][1]
+                start_pos, end_pos = self.design.terminals(comp)
                 color = "darkgreen"
             else:
-                start_pos = comp['abs_terminals'][1]
-                end_pos = comp['abs_terminals'][0]
+                end_pos, start_pos = self.design.terminals(comp)
                 color = "darkorange"
 
             arrow_ids = self.draw_arrow_with_label(start_pos, end_pos, color, 2, 35, "{:.2e}A", abs(current), offset_distance=30)
@@ -1147,18 +1408,17 @@ class CircuitGUI(tk.Tk):
 
         for e in self.simulator.elements:
             if e.element_type == 'wire':
-                node1 = e.nodes[0]
-                node2 = e.nodes[1]
+                node1, node2 = e.nodes
                 if node1 is not None:
-                    pos1 = e.comp1['abs_terminals'][e.term1_idx]
+                    pos1 = self.design.terminal(e.comp1, e.term1_idx)
                     node_to_positions.setdefault(node1, []).append(pos1)
                 if node2 is not None:
-                    pos2 = e.comp2['abs_terminals'][e.term2_idx]
+                    pos2 = self.design.terminal(e.comp2, e.term2_idx)
                     node_to_positions.setdefault(node2, []).append(pos2)
             else:
-                comp_dict = next((c for c in self.components if c['element'] == e), None)
+                comp_dict = self.component_by_element.get(e.element_id)
                 if comp_dict:
-                    for term_idx, pos in enumerate(comp_dict['abs_terminals']):
+                    for term_idx, pos in enumerate(self.design.terminals(comp_dict)):
                         node = e.nodes[term_idx]
                         if node is not None:
                             node_to_positions.setdefault(node, []).append(pos)
@@ -1203,16 +1463,16 @@ class CircuitGUI(tk.Tk):
                 color = "black"
 
             label_text = f"V{node_id} = {voltage:.5f} V"
-            label_id = self.canvas.create_text(x, y - 15, text=label_text, fill=color, font=("Arial", 10, "bold"))
+            label_id = self.world_item("text", x, y - 15, text=label_text, fill=color, font=("Arial", 10, "bold"))
             self.node_labels[node_id] = label_id
             logging.debug(f"Created label for Node {node_id} at ({x}, {y - 15}) with voltage {voltage:.5f} V and color {color}")
 
         ground_nodes = [c for c in self.components if c.get("is_ground")]
         if ground_nodes:
             ground = ground_nodes[0]
-            cx, cy = ground['center']
+            cx, cy = self.design.center(ground)
             label_text = f"Ground (V0) = 0.00 V"
-            label_id = self.canvas.create_text(cx, cy + 30, text=label_text, fill="black", font=("Arial", 10, "bold", "italic"))
+            label_id = self.world_item("text", cx, cy + 30, text=label_text, fill="black", font=("Arial", 10, "bold", "italic"))
             self.node_labels[0] = label_id
             logging.debug(f"Created label for Ground node at ({cx}, {cy + 30})")
 
@@ -1229,7 +1489,7 @@ class CircuitGUI(tk.Tk):
         arrow_end = (arrow_start[0] + arrow_length * math.cos(angle),
                     arrow_start[1] + arrow_length * math.sin(angle))
 
-        arrow_id = self.canvas.create_line(
+        arrow_id = self.world_item("line",
             arrow_start[0], arrow_start[1],
             arrow_end[0], arrow_end[1],
             arrow=tk.LAST, fill=arrow_color, width=arrow_thickness)
@@ -1242,7 +1502,7 @@ class CircuitGUI(tk.Tk):
         label_x += -label_offset * math.sin(angle)
         label_y += label_offset * math.cos(angle)
 
-        label_id = self.canvas.create_text(
+        label_id = self.world_item("text",
             label_x, label_y,
             text=label_text, fill=arrow_color,
             font=("Arial", 9, "bold"),
@@ -1,26 +1,173 @@
 from union_find import UnionFind
+from node_registry import NodeRegistry
+from structural_rank import structural_rank
+from node_ordering import ORDERINGS
+from topology_cache import TopologyCache
+from network_reduction import NetworkReduction
+from solve_stats import SolveStats
+from batch_solver import SharedBatchPool, solve_dense_batch, solve_sparse_batch
+from iterative_solver import CooMatrix, solve_mna
 from circuit_elements import CircuitElement, Wire
-from imports import *
 import numpy as np
 import logging
-import tkinter as tk
-from tkinter import messagebox
+import hashlib
+import time
+from collections import deque
+
+
+class SimulationCancelled(Exception):
+    """
+    Raised from inside solve_circuit when cancel_event has been set.
+    """
+    pass
+
 
 class CircuitSimulator:
     """
     Stores the netlist (list of circuit elements) and performs MNA-based DC simulation.
     """
+    # Independent blocks at least this large are solved concurrently (LAPACK releases the GIL).
+    PARALLEL_BLOCK_SIZE = 200
+    # solve_batch uses stacked dense solves up to this many unknowns, iterative ones beyond.
+    BATCH_DENSE_LIMIT = 500
+
     def __init__(self):
         self.elements = []
         self.node_map = {}
         self.next_node_index = 0
         self.voltage_sources = []
         self.uf = UnionFind()
+        # Terminal node ids of the live elements, for O(1)-amortized wiring edits.
+        self.node_registry = NodeRegistry()
+        # Matrix ordering of nodes (see node_ordering.ORDERINGS). The dense block and CG
+        # solvers give the same result for any order, so the bandwidth/fill-reducing
+        # orderings only pay off for a solver that factors the sparse matrix.
+        self.node_ordering = "natural"
+        # Structure-only analysis is reused across solves of the same topology.
+        self.topology_cache = TopologyCache()
+        self.topology_key = None
+        self.structure = None
+        # Optional exact series/parallel reduction before solving (see NetworkReduction).
+        self.reduce_network = False
+        self.reduction = None
+        # Index arrays of the independent diagonal blocks of the last stamped system.
+        self.blocks = []
+        self.max_workers = None
+        # "direct" (dense LAPACK per block) or "iterative" (CG on the sparse pattern, see solve_mna).
+        self.solver = "direct"
+        self.iterative_tolerance = 1e-10
+        self.iterative_max_iter = None
+        # Previous MNA solution, used as the iterative solvers' starting point.
+        self.last_solution = None
+        self.solver_iterations = 0
+        self.solver_residual = None
+        # Optional persistent ResultCache; use_result_cache=False bypasses it.
+        self.result_cache = None
+        self.use_result_cache = True
+        # Per-phase timings of the last solve_circuit run (see SolveStats.MODES for profile_mode).
+        self.profile_mode = None
+        self.last_stats = None
+        # Timings of the last sensitivities() adjoint solve, kept apart from the forward solve's.
+        self.adjoint_stats = None
+        # Forward MNA matrix and solution of the last solve, for adjoint sensitivities.
+        self.last_system = None
+        # Scenario indices that solve_batch could not solve.
+        self.batch_failures = []
+        # SharedBatchPool for large batches, created on first use and kept for later jobs.
+        self.batch_pool = None
+        # Stable integer ids: element_id -> element, and (after stamping)
+        # element_id -> position in element_table / branch-current index.
+        self.next_element_id = 0
+        self.element_by_id = {}
+        # element_id -> index into self.elements, for O(1) removal.
+        self.element_slot = {}
+        self.element_table = {}
+        self.element_position = {}
+        self.branch_index = {}
+        # Bumped on every netlist edit so background solves can detect stale results.
+        self.revision = 0
+        self.last_error = None
+        self.floating_islands = []
+        self.cancel_event = None
+        self.progress_callback = None
 
     def clear_all(self):
         self.elements.clear()
+        self.element_by_id.clear()
+        self.element_slot.clear()
+        self.element_table = {}
+        self.element_position.clear()
+        self.branch_index.clear()
         self.node_map.clear()
         self.next_node_index = 0
+        self.node_registry.clear()
+        self.mark_modified()
+
+    def mark_modified(self):
+        self.revision += 1
+
+    def snapshot(self):
+        """
+        Return a detached copy of the netlist that can be solved on a worker thread
+        while the GUI keeps editing the original elements.
+        Wires are flattened to plain elements with their current node ids.
+        """
+        sim = CircuitSimulator()
+        for e in self.elements:
+            copy = CircuitElement(e.name, e.value, e.element_type)
+            copy.nodes = list(e.nodes)
+            copy.element_id = e.element_id
+            sim.elements.append(copy)
+            sim.element_by_id[copy.element_id] = copy
+        sim.element_slot = dict(self.element_slot)
+        sim.next_element_id = self.next_element_id
+        sim.node_ordering = self.node_ordering
+        sim.reduce_network = self.reduce_network
+        sim.max_workers = self.max_workers
+        sim.solver = self.solver
+        sim.iterative_tolerance = self.iterative_tolerance
+        sim.iterative_max_iter = self.iterative_max_iter
+        sim.last_solution = self.last_solution
+        sim.result_cache = self.result_cache
+        sim.use_result_cache = self.use_result_cache
+        sim.profile_mode = self.profile_mode
+        sim.topology_cache = self.topology_cache
+        sim.revision = self.revision
+        return sim
+
+    def adopt_solution(self, solved):
+        """
+        Take over the node mapping computed on a snapshot() of this simulator,
+        so node_map, uf and voltage_sources refer to the live elements.
+        """
+        self.uf = solved.uf
+        self.node_map = solved.node_map
+        self.next_node_index = solved.next_node_index
+        self.element_table = solved.element_table
+        self.element_position = solved.element_position
+        self.branch_index = solved.branch_index
+        self.structure = solved.structure
+        self.blocks = solved.blocks
+        self.reduction = solved.reduction
+        self.last_solution = solved.last_solution
+        self.last_system = solved.last_system
+        self.solver_iterations = solved.solver_iterations
+        self.solver_residual = solved.solver_residual
+        self.last_stats = solved.last_stats
+        self.voltage_sources = [self.element_by_id[vs.element_id] for vs in solved.voltage_sources]
+
+    def report_progress(self, phase):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SimulationCancelled()
+        if self.progress_callback is not None:
+            self.progress_callback(phase)
+
+    def report_error(self, message, show_errors):
+        self.last_error = message
+        if show_errors:
+            # Imported here so headless use never loads tkinter.
+            from tkinter import messagebox
+            messagebox.showerror("Simulation Error", message)
 
     def build_union_find(self):
         """
@@ -36,208 +183,926 @@ class CircuitSimulator:
                     logging.debug(f"Merged nodes {node1} and {node2} via wire.")
 
     def add_element(self, element):
+        element.element_id = self.next_element_id
+        self.next_element_id += 1
+        self.element_by_id[element.element_id] = element
+        self.element_slot[element.element_id] = len(self.elements)
         self.elements.append(element)
+        self.node_registry.register(element)
+        self.mark_modified()
         logging.debug(f"Added element: {element}")
 
+    def add_elements(self, elements):
+        """
+        Bulk add_element: ids are assigned in one pass and the netlist revision
+        is bumped once, with no per-element logging.
+        """
+        start = len(self.elements)
+        for k, element in enumerate(elements):
+            element.element_id = self.next_element_id + k
+            self.element_by_id[element.element_id] = element
+            self.element_slot[element.element_id] = start + k
+            self.node_registry.register(element)
+        self.elements.extend(elements)
+        self.next_element_id += len(self.elements) - start
+        self.mark_modified()
+        logging.debug(f"Added {len(self.elements) - start} elements")
+
     def remove_element(self, element):
-        if element in self.elements:
-            self.elements.remove(element)
-            logging.debug(f"Removed element: {element}")
+        """
+        Remove in O(1): the last element is moved into the freed slot, so the
+        order of self.elements is not preserved.
+        """
+        slot = self.element_slot.get(element.element_id)
+        if slot is None or self.elements[slot] is not element:
+            return
+        del self.element_slot[element.element_id]
+        last = self.elements.pop()
+        if last is not element:
+            self.elements[slot] = last
+            self.element_slot[last.element_id] = slot
+        self.element_by_id.pop(element.element_id, None)
+        self.node_registry.unregister(element)
+        self.mark_modified()
+        logging.debug(f"Removed element: {element}")
+
+    def topology_fingerprint(self):
+        """
+        Hash of element types and raw terminal node ids (wires included, in netlist
+        order). It is computed before any union-find work, and netlists that differ
+        only in element values share the same fingerprint.
+        """
+        type_codes = {'wire': 0, 'resistor': 1, 'voltage_source': 2, 'current_source': 3}
+        count = len(self.elements)
+        rows = np.empty((count, 3), dtype=np.int64)
+        for k, e in enumerate(self.elements):
+            n1, n2 = e.nodes
+            rows[k] = (type_codes.get(e.element_type, -2), -1 if n1 is None else n1, -1 if n2 is None else n2)
+        return hashlib.blake2b(rows.tobytes(), digest_size=16).hexdigest()
 
     def build_node_map(self):
         """
         Assign unique indices to each unique node after merging connected nodes.
         Node 0 (ground) is treated separately and not included in node_map.
+        Indices follow the ordering named by self.node_ordering; the node
+        adjacency is only collected for orderings that need it.
         """
         self.node_map = {}
         self.next_node_index = 0
+        ground = self.uf.find(0)
 
         unique_nodes = set()
+        adjacency = {}
+        needs_adjacency = self.node_ordering != "natural"
         for e in self.elements:
             if e.element_type == 'wire':
                 continue
-            for nd in e.nodes:
-                if nd is not None and nd != 0:
-                    unique_nodes.add(self.uf.find(nd))
+            roots = [self.uf.find(nd) for nd in e.nodes if nd is not None]
+            roots = [r for r in roots if r != ground]
+            unique_nodes.update(roots)
+            if needs_adjacency and len(roots) == 2 and roots[0] != roots[1]:
+                adjacency.setdefault(roots[0], set()).add(roots[1])
+                adjacency.setdefault(roots[1], set()).add(roots[0])
 
-        sorted_nodes = sorted(unique_nodes)
-        for node_id in sorted_nodes:
-            if node_id not in self.node_map:
-                self.node_map[node_id] = self.next_node_index
-                logging.debug(f"Mapped node {node_id} to matrix index {self.node_map[node_id]}")
-                self.next_node_index += 1
+        order = ORDERINGS[self.node_ordering](unique_nodes, adjacency)
+        for node_id in order:
+            self.node_map[node_id] = self.next_node_index
+            self.next_node_index += 1
+        logging.debug(f"Mapped {self.next_node_index} nodes to matrix indices using {self.node_ordering} ordering")
 
     def detect_floating_nodes(self):
         """
         Check if all nodes are reachable from ground (node 0) through any components.
-        Uses BFS to traverse the circuit topology.
+        A second union-find pass over the component edges (on top of the wire merges
+        in self.uf) labels every connected island in near-linear time.
+        Each island not containing ground is recorded in self.floating_islands
+        with its nodes, its member elements' positions in self.elements (which
+        the topology cache can reuse) and their names.
         """
-        # Build adjacency graph of all node connections
-        graph = {}
-        for e in self.elements:
-            if e.element_type == 'wire':
-                continue
-            n1, n2 = e.nodes[0], e.nodes[1]
-            if n1 is not None and n2 is not None:
-                r1 = self.uf.find(n1)
-                r2 = self.uf.find(n2)
-                graph.setdefault(r1, set()).add(r2)
-                graph.setdefault(r2, set()).add(r1)
-
-        # BFS from ground to find all reachable nodes
+        self.floating_islands = []
+        islands = UnionFind()
         ground = self.uf.find(0)
-        if ground not in graph:
+        islands.find(ground)
+        components = [(position, e) for position, e in enumerate(self.elements)
+                      if e.element_type != 'wire' and e.nodes[0] is not None and e.nodes[1] is not None]
+        ground_connected = False
+        for _, e in components:
+            r1 = self.uf.find(e.nodes[0])
+            r2 = self.uf.find(e.nodes[1])
+            ground_connected = ground_connected or ground in (r1, r2)
+            islands.union(r1, r2)
+
+        if not ground_connected:
             logging.error("Ground node has no connections!")
             return set([ground])
 
-        visited = set([ground])
-        queue = [ground]
+        ground_island = islands.find(ground)
+        floating = {}
+        for position, e in components:
+            r1 = self.uf.find(e.nodes[0])
+            island = islands.find(r1)
+            if island == ground_island:
+                continue
+            entry = floating.setdefault(island, {"nodes": set(), "positions": []})
+            entry["nodes"].update((r1, self.uf.find(e.nodes[1])))
+            entry["positions"].append(position)
+
+        if not floating:
+            return None
+
+        floating_nodes = set()
+        for entry in floating.values():
+            floating_nodes |= entry["nodes"]
+            self.floating_islands.append({"nodes": sorted(entry["nodes"]), "positions": entry["positions"],
+                                          "elements": self.element_names(entry["positions"])})
+            logging.error(f"Floating island with nodes {sorted(entry['nodes'])} contains: "
+                          f"{', '.join(self.floating_islands[-1]['elements'])}")
+        logging.warning(f"Detected floating nodes: {floating_nodes}")
+        return floating_nodes
+
+    def validate_topology(self):
+        """
+        Structural checks that catch singular circuits before any matrix is built:
+        loops made only of voltage sources, node groups connected to the rest of the
+        circuit only through current sources (current-source cut-sets), and finally
+        a bipartite-matching structural-rank test of the MNA pattern.
+        Returns a list of problems as (message, positions) pairs: the offending
+        elements are given by their positions in self.elements, so the problems
+        can be cached per topology, and format_problem fills their names into
+        the message's {names} field.
+        """
+        problems = []
+        ground = self.uf.find(0)
+        components = [(position, e) for position, e in enumerate(self.elements) if e.element_type != 'wire']
+
+        def roots(e):
+            return self.uf.find(e.nodes[0]), self.uf.find(e.nodes[1])
+
+        # Voltage-source loops: a source whose terminals are already tied together
+        # by other voltage sources over-determines the loop.
+        vs_forest = UnionFind()
+        vs_edges = {}
+        for position, e in components:
+            if e.element_type != 'voltage_source':
+                continue
+            r1, r2 = roots(e)
+            if vs_forest.find(r1) == vs_forest.find(r2):
+                loop = [position] + self.voltage_source_path(vs_edges, r1, r2)
+                problems.append(("Voltage sources form a loop: {names}", loop))
+                continue
+            vs_forest.union(r1, r2)
+            vs_edges.setdefault(r1, []).append((r2, position))
+            vs_edges.setdefault(r2, []).append((r1, position))
+
+        # Current-source cut-sets: group nodes connected through resistors and
+        # voltage sources; groups away from ground are only reached by current sources.
+        conducting = UnionFind()
+        conducting.find(ground)
+        for _, e in components:
+            if e.element_type != 'current_source':
+                conducting.union(*roots(e))
+        ground_group = conducting.find(ground)
+        cut_sets = {}
+        for position, e in components:
+            if e.element_type != 'current_source':
+                continue
+            for r in roots(e):
+                group = conducting.find(r)
+                if group != ground_group:
+                    cut_sets.setdefault(group, [])
+                    if position not in cut_sets[group]:
+                        cut_sets[group].append(position)
+        for positions in cut_sets.values():
+            problems.append(("Node group is connected only through current sources: {names}", positions))
+
+        if problems:
+            for problem in problems:
+                logging.error(self.format_problem(problem))
+            return problems
+
+        num_nodes = self.next_node_index
+        vsources = [(position, e) for position, e in components if e.element_type == 'voltage_source']
+        adjacency = [set() for _ in range(num_nodes + len(vsources))]
+        for _, e in components:
+            if e.element_type == 'resistor':
+                rows = [self.node_row(n) for n in e.nodes if self.node_row(n) >= 0]
+                for a in rows:
+                    adjacency[a].update(rows)
+        for k, (_, e) in enumerate(vsources):
+            branch = num_nodes + k
+            for n in e.nodes:
+                row = self.node_row(n)
+                if row >= 0:
+                    adjacency[row].add(branch)
+                    adjacency[branch].add(row)
+        rank, unmatched = structural_rank(len(adjacency), [list(cols) for cols in adjacency])
+        if unmatched:
+            # Node rows are named in the message itself; branch rows by their source's position.
+            row_nodes = {row: node for node, row in self.node_map.items()}
+            checks = [f"node {row_nodes[r]}" for r in sorted(unmatched) if r < num_nodes]
+            positions = [vsources[r - num_nodes][0] for r in sorted(unmatched) if r >= num_nodes]
+            if positions:
+                checks.append("{names}")
+            problems.append((f"Circuit is structurally singular (rank {rank}/{len(adjacency)}); "
+                             f"check {', '.join(checks)}", positions))
+            logging.error(self.format_problem(problems[-1]))
+        return problems
+
+    def element_names(self, positions):
+        return [self.elements[position].name for position in positions]
+
+    def format_problem(self, problem):
+        """
+        Message of a validate_topology problem with the element names filled in.
+        """
+        message, positions = problem
+        return message.replace("{names}", ", ".join(self.element_names(positions)))
+
+    def voltage_source_path(self, vs_edges, start, goal):
+        """
+        Positions of the voltage sources on the forest path from start to goal.
+        """
+        previous = {start: None}
+        queue = deque([start])
         while queue:
-            node = queue.pop(0)
-            for neighbor in graph.get(node, set()):
-                if neighbor not in visited:
-                    visited.add(neighbor)
+            node = queue.popleft()
+            if node == goal:
+                break
+            for neighbor, position in vs_edges.get(node, []):
+                if neighbor not in previous:
+                    previous[neighbor] = (node, position)
                     queue.append(neighbor)
+        path = []
+        node = goal
+        while previous.get(node) is not None:
+            node, position = previous[node]
+            path.append(position)
+        return path
 
-        # Find all nodes in circuit
-        all_nodes = set()
-        for e in self.elements:
-            if e.element_type == 'wire':
-                continue
-            for node in e.nodes:
-                if node is not None:
-                    all_nodes.add(self.uf.find(node))
+    def node_row(self, node_id):
+        """
+        Matrix row of a node after merging, or -1 for ground and unmapped nodes.
+        """
+        if node_id is None or node_id == 0:
+            return -1
+        return self.node_map.get(self.uf.find(node_id), -1)
 
-        # Floating nodes are those not reachable from ground
-        floating_nodes = all_nodes - visited
-        if floating_nodes:
-            logging.warning(f"Detected floating nodes: {floating_nodes}")
-            # Log which components have floating nodes
-            for e in self.elements:
-                if e.element_type == 'wire':
-                    continue
-                for node in e.nodes:
-                    if node is not None and self.uf.find(node) in floating_nodes:
-                        logging.error(f"Component {e.name} has floating node: {node} (merged to {self.uf.find(node)})")
-            return floating_nodes
-        return None
+    def prepare_element_table(self):
+        self.voltage_sources = [e for e in self.elements if e.element_type == 'voltage_source']
+        self.branch_index = {e.element_id: k for k, e in enumerate(self.voltage_sources)}
+        self.build_element_table()
+
+    def result_keys(self):
+        """
+        Canonical hashes for the result cache, from element_table: the structure
+        key covers element types and merged node rows (so raw node ids and wire
+        layout don't matter), the content key adds the element values and the
+        solver that produced the result (with its tolerance when iterative), so
+        a loose iterative solution is never served to a direct solve.
+        """
+        t = self.element_table
+        structure = hashlib.blake2b(digest_size=12)
+        structure.update(f"{self.node_ordering}|{self.reduce_network}|{self.next_node_index}|".encode())
+        structure.update("|".join(t["types"].tolist()).encode())
+        structure.update(t["row1"].tobytes())
+        structure.update(t["row2"].tobytes())
+        content = structure.copy()
+        content.update(t["values"].tobytes())
+        tolerance = self.iterative_tolerance if self.solver == "iterative" else ""
+        content.update(f"|{self.solver}|{tolerance}".encode())
+        return structure.hexdigest(), content.hexdigest()
+
+    def build_element_table(self):
+        """
+        Flatten the non-wire elements into parallel arrays: element ids, types,
+        values, the MNA rows of both terminals and the voltage-source branch index
+        (-1 where not applicable). Post-processing works on these arrays only.
+        The structural arrays are taken from self.structure when it has them.
+        """
+        elements = [e for e in self.elements if e.element_type != 'wire']
+        count = len(elements)
+        structural = self.structure.get("table") if self.structure is not None else None
+        if structural is None:
+            structural = {
+                "types": np.array([e.element_type for e in elements], dtype=str),
+                "row1": np.fromiter((self.node_row(e.nodes[0]) for e in elements), dtype=np.int64, count=count),
+                "row2": np.fromiter((self.node_row(e.nodes[1]) for e in elements), dtype=np.int64, count=count),
+                "branch": np.fromiter((self.branch_index.get(e.element_id, -1) for e in elements), dtype=np.int64, count=count),
+            }
+            if self.structure is not None:
+                self.structure["table"] = structural
+        self.element_table = {
+            "elements": elements,
+            "ids": np.fromiter((e.element_id for e in elements), dtype=np.int64, count=count),
+            "values": np.fromiter((e.value for e in elements), dtype=float, count=count),
+            **structural,
+        }
+        self.element_position = {e.element_id: k for k, e in enumerate(elements)}
+
+    def build_stamp_pattern(self):
+        """
+        Precompute where every element lands in A and z, as COO index arrays into
+        element_table positions, so stamping is a few vectorized scatter-adds.
+        """
+        t = self.element_table
+        types, row1, row2, branch = t["types"], t["row1"], t["row2"], t["branch"]
+        num_nodes = self.next_node_index
+
+        res = np.flatnonzero(types == 'resistor')
+        r1, r2 = row1[res], row2[res]
+        has1, has2 = r1 >= 0, r2 >= 0
+        both = has1 & has2
+        g_rows = np.concatenate([r1[has1], r2[has2], r1[both], r2[both]])
+        g_cols = np.concatenate([r1[has1], r2[has2], r2[both], r1[both]])
+        g_elems = np.concatenate([res[has1], res[has2], res[both], res[both]])
+        g_signs = np.concatenate([np.ones(has1.sum() + has2.sum()), -np.ones(2 * both.sum())])
+
+        vs = np.flatnonzero(types == 'voltage_source')
+        vs_rows = num_nodes + branch[vs]
+        v1, v2 = row1[vs], row2[vs]
+        has1, has2 = v1 >= 0, v2 >= 0
+        b_rows = np.concatenate([v1[has1], vs_rows[has1], v2[has2], vs_rows[has2]])
+        b_cols = np.concatenate([vs_rows[has1], v1[has1], vs_rows[has2], v2[has2]])
+        b_vals = np.concatenate([np.ones(2 * has1.sum()), -np.ones(2 * has2.sum())])
+
+        cs = np.flatnonzero(types == 'current_source')
+        c1, c2 = row1[cs], row2[cs]
+        has1, has2 = c1 >= 0, c2 >= 0
+        z_rows = np.concatenate([c1[has1], c2[has2]])
+        z_elems = np.concatenate([cs[has1], cs[has2]])
+        z_signs = np.concatenate([-np.ones(has1.sum()), np.ones(has2.sum())])
+
+        return {
+            "g_rows": g_rows, "g_cols": g_cols, "g_elems": g_elems, "g_signs": g_signs,
+            "b_rows": b_rows, "b_cols": b_cols, "b_vals": b_vals,
+            "z_rows": z_rows, "z_elems": z_elems, "z_signs": z_signs,
+            "vs_rows": vs_rows, "vs_elems": vs,
+        }
+
+    def conductances(self, values=None):
+        """
+        1/R for every resistor in element_table (0 elsewhere), applying the same
+        substitutions for non-positive and near-zero resistances as before.
+        values defaults to element_table["values"]; a (scenarios, elements)
+        matrix gives one row of conductances per scenario.
+        """
+        t = self.element_table
+        res = t["types"] == 'resistor'
+        r = np.where(res, t["values"] if values is None else values, 1.0)
+        for k in np.flatnonzero((res & (r <= 0)).reshape(-1, len(res)).any(axis=0)):
+            logging.error(f"Resistor {t['elements'][k].name} has non-positive resistance. Using 1 Ohm instead.")
+        r = np.where(r <= 0, 1.0, r)
+        for k in np.flatnonzero((res & (np.abs(r) < 1e-15)).reshape(-1, len(res)).any(axis=0)):
+            logging.warning(f"Resistor {t['elements'][k].name} has near-zero resistance; replacing with 1e-12 Ohms.")
+        r = np.where(np.abs(r) < 1e-15, 1e-12, r)
+        return np.where(res, 1.0 / r, 0.0)
 
     def stamp_matrices(self):
         """
         Stamps the conductance matrix A and source vector z based on the circuit elements.
         Returns the matrices A, z, number of nodes, and number of voltage sources.
+        The stamping pattern depends only on topology and is cached in self.structure.
+        Expects prepare_element_table() to have run for the current netlist.
         """
-        self.voltage_sources = [e for e in self.elements if e.element_type == 'voltage_source']
         num_vsources = len(self.voltage_sources)
         num_nodes = self.next_node_index
+        pattern = self.stamp_pattern()
+
+        self.reduction = None
+        if self.reduce_network:
+            return self.stamp_reduced_matrices(pattern)
+        self.blocks = pattern["blocks"]
 
         n = num_nodes + num_vsources
-        A = np.zeros((n, n))
         z = np.zeros(n)
-
-        def n_idx(node_id):
-            if node_id == 0:
-                return None
-            return self.node_map.get(self.uf.find(node_id), None)
-
-
-        for e in self.elements:
-            if e.element_type == 'resistor':
-                r = e.value
-                if r <= 0:
-                    logging.error(f"Resistor {e.name} has non-positive resistance: {r} Ohms. Using 1 Ohm instead.")
-                    r = 1.0
-                elif abs(r) < 1e-15:
-                    logging.warning(f"Resistor {e.name} has near-zero resistance; replacing with 1e-12 Ohms.")
-                    r = 1e-12
-                g = 1.0 / r
-                n1 = n_idx(e.nodes[0])
-                n2 = n_idx(e.nodes[1])
-                logging.debug(f"Stamping resistor {e.name} between nodes {e.nodes[0]} and {e.nodes[1]} with conductance {g}")
-                if n1 is not None and n2 is not None:
-                    A[n1, n1] += g
-                    A[n2, n2] += g
-                    A[n1, n2] -= g
-                    A[n2, n1] -= g
-                elif n1 is not None:
-                    A[n1, n1] += g
-                elif n2 is not None:
-                    A[n2, n2] += g
-
-        for e in self.elements:
-            if e.element_type == 'current_source':
-                i_val = e.value
-                n1 = n_idx(e.nodes[0])
-                n2 = n_idx(e.nodes[1])
-                logging.debug(f"Stamping current source {e.name} from node {e.nodes[0]} to node {e.nodes[1]} with value {i_val}")
-                if n1 is not None:
-                    z[n1] -= i_val
-                if n2 is not None:
-                    z[n2] += i_val
-
-        vs_i = 0
-        for e in self.voltage_sources:
-            v_val = e.value
-            n1 = n_idx(e.nodes[0])
-            n2 = n_idx(e.nodes[1])
-            logging.debug(f"Stamping voltage source {e.name} from node {e.nodes[0]} to node {e.nodes[1]} with voltage {v_val}")
-            row = num_nodes + vs_i
-            if n1 is not None:
-                A[n1, row] += 1
-                A[row, n1] += 1
-            if n2 is not None:
-                A[n2, row] -= 1
-                A[row, n2] -= 1
-            z[row] = v_val
-            vs_i += 1
+        values = self.element_table["values"]
+        g = self.conductances()
+        A = self.assemble(n, np.concatenate([pattern["g_rows"], pattern["b_rows"]]),
+                          np.concatenate([pattern["g_cols"], pattern["b_cols"]]),
+                          np.concatenate([pattern["g_signs"] * g[pattern["g_elems"]], pattern["b_vals"]]))
+        np.add.at(z, pattern["z_rows"], pattern["z_signs"] * values[pattern["z_elems"]])
+        z[pattern["vs_rows"]] = values[pattern["vs_elems"]]
 
         logging.debug(f"Conductance Matrix A:\n{A}")
         logging.debug(f"Source Vector z:\n{z}")
 
         return A, z, num_nodes, num_vsources
 
-    def solve_circuit(self):
+    def stamp_pattern(self):
         """
-        Solve the matrix equation using Modified Nodal Analysis.
-        Return (node_voltages, voltage_source_currents).
+        The stamping pattern (with its diagonal blocks) of the current element
+        table, from self.structure when it was already built for this topology.
         """
-        self.build_union_find()
-        self.build_node_map()
+        pattern = self.structure.get("pattern") if self.structure is not None else None
+        if pattern is None:
+            pattern = self.build_stamp_pattern()
+            pattern["blocks"] = self.build_blocks(self.next_node_index + len(self.voltage_sources),
+                                                  np.concatenate([pattern["g_rows"], pattern["b_rows"]]),
+                                                  np.concatenate([pattern["g_cols"], pattern["b_cols"]]))
+            if self.structure is not None:
+                self.structure["pattern"] = pattern
+                self.topology_cache.put((self.topology_key, self.node_ordering), self.structure)
+        return pattern
 
-        floating_nodes = self.detect_floating_nodes()
-        if floating_nodes:
-            return None, None
+    def stamp_reduced_matrices(self, pattern):
+        """
+        Like stamp_matrices, but on the network left after NetworkReduction.
+        Source terminals are pinned, so only resistor-only nodes are eliminated and
+        the source stamps just need their rows renumbered.
+        Returns A, z, the number of reduced nodes and the number of voltage sources.
+        """
+        t = self.element_table
+        num_nodes = self.next_node_index
+        num_vsources = len(self.voltage_sources)
+        res = t["types"] == 'resistor'
+        sources = ~res
+        pinned = np.concatenate([t["row1"][sources], t["row2"][sources]])
+        self.reduction = NetworkReduction(num_nodes, t["row1"][res], t["row2"][res],
+                                          self.conductances()[res], pinned[pinned >= 0])
+        new_index = self.reduction.new_index
+        m = len(self.reduction.kept)
+
+        n = m + num_vsources
+        z = np.zeros(n)
+        values = t["values"]
+        g_rows, g_cols, g_vals = self.reduction.conductance_stamps()
 
-        A, z, num_nodes, num_vsources = self.stamp_matrices()
+        def renumber(rows):
+            return np.where(rows >= num_nodes, rows - num_nodes + m, new_index[np.minimum(rows, num_nodes - 1)])
 
+        rows = np.concatenate([g_rows, renumber(pattern["b_rows"])])
+        cols = np.concatenate([g_cols, renumber(pattern["b_cols"])])
+        A = self.assemble(n, rows, cols, np.concatenate([g_vals, pattern["b_vals"]]))
+        if self.solver == "direct":
+            self.blocks = self.build_blocks(n, rows, cols)
+        np.add.at(z, new_index[pattern["z_rows"]], pattern["z_signs"] * values[pattern["z_elems"]])
+        z[pattern["vs_rows"] - num_nodes + m] = values[pattern["vs_elems"]]
+
+        logging.debug(f"Reduced MNA system from {num_nodes + num_vsources} to {n} unknowns")
+        return A, z, m, num_vsources
+
+    def assemble(self, n, rows, cols, vals):
+        """
+        MNA matrix from COO triplets: dense for the direct solver, left as a
+        CooMatrix for the iterative one so memory stays O(nnz).
+        """
+        if self.solver == "iterative":
+            return CooMatrix(n, rows, cols, vals)
+        A = np.zeros((n, n))
+        np.add.at(A, (rows, cols), vals)
+        return A
+
+    def build_blocks(self, n, rows, cols):
+        """
+        Split the n unknowns into independent diagonal blocks: unknowns coupled by an
+        off-diagonal entry (rows[k], cols[k]) are merged with union-find. Ground is
+        not an unknown, so subcircuits that only share ground end up in separate blocks.
+        Returns a list of sorted index arrays, largest block first.
+        """
+        blocks_uf = UnionFind()
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            if r != c:
+                blocks_uf.union(r, c)
+        labels = np.fromiter((blocks_uf.find(k) for k in range(n)), dtype=np.int64, count=n)
+        order = np.argsort(labels, kind="stable")
+        starts = np.flatnonzero(np.diff(labels[order], prepend=-1))
+        blocks = sorted(np.split(order, starts[1:]), key=len, reverse=True) if n else []
+        logging.debug(f"System of {n} unknowns splits into {len(blocks)} independent blocks")
+        return blocks
+
+    def solve_block(self, A, z, index):
+        """
+        Rank-check and solve one diagonal block. Returns (solution, error message).
+        """
+        block = A[np.ix_(index, index)]
+        start = time.perf_counter()
         try:
-            rank = np.linalg.matrix_rank(A)
-            if rank < A.shape[0]:
-                logging.error(f"Matrix A is singular or rank-deficient (rank={rank}/{A.shape[0]}).")
-                messagebox.showerror("Simulation Error", "The circuit matrix is singular or ill-conditioned.")
-                return None, None
+            rank = np.linalg.matrix_rank(block)
         except Exception as e:
             logging.error(f"Error computing matrix rank: {e}")
-            messagebox.showerror("Simulation Error", f"Error computing matrix rank: {e}")
-            return None, None
+            return None, f"Error computing matrix rank: {e}"
+        finally:
+            if self.last_stats is not None:
+                self.last_stats.add("solve.rank_check", time.perf_counter() - start)
+        if rank < len(index):
+            logging.error(f"Matrix block of size {len(index)} is singular or rank-deficient (rank={rank}/{len(index)}).")
+            return None, "The circuit matrix is singular or ill-conditioned."
+        start = time.perf_counter()
+        try:
+            return np.linalg.solve(block, z[index]), None
+        except np.linalg.LinAlgError as e:
+            logging.error(f"LinAlgError: {e}")
+            return None, "Circuit matrix is singular or ill-conditioned."
+        finally:
+            if self.last_stats is not None:
+                self.last_stats.add("solve.linear_solve", time.perf_counter() - start)
 
+    def solve_blocks(self, A, z):
+        """
+        Solve A x = z block by block (self.blocks), scattering each block's solution
+        back into the global ordering. Large blocks go to a thread pool when there is
+        more than one of them. Returns (x, error message).
+        """
+        x = np.zeros(len(z))
+        large = [index for index in self.blocks if len(index) >= self.PARALLEL_BLOCK_SIZE]
+        small = [index for index in self.blocks if len(index) < self.PARALLEL_BLOCK_SIZE]
+        if len(large) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [(index, pool.submit(self.solve_block, A, z, index)) for index in large]
+                for index, future in futures:
+                    solution, error = future.result()
+                    if error:
+                        return None, error
+                    x[index] = solution
+                    self.report_progress(f"Solved block of {len(index)} unknowns")
+        else:
+            small = large + small
+        for index in small:
+            solution, error = self.solve_block(A, z, index)
+            if error:
+                return None, error
+            x[index] = solution
+        return x, None
+
+    def solve_iterative(self, A, z, num_vsources):
+        """
+        Solve A x = z with solve_mna (CG after eliminating the node voltages set
+        by voltage sources), warm-started from last_solution when it has the
+        right size. Returns (x, error message).
+        """
+        x0 = self.last_solution if self.last_solution is not None and len(self.last_solution) == len(z) else None
         try:
-            x = np.linalg.solve(A, z)
-            logging.debug(f"Solved vector x:\n{x}")
+            x, self.solver_iterations, self.solver_residual = solve_mna(
+                A, z, len(z) - num_vsources, x0=x0, tol=self.iterative_tolerance, max_iter=self.iterative_max_iter)
         except np.linalg.LinAlgError as e:
             logging.error(f"LinAlgError: {e}")
-            messagebox.showerror("Simulation Error", "Circuit matrix is singular or ill-conditioned.")
-            try:
-                rank = np.linalg.matrix_rank(A)
-                print(f"Matrix A Rank: {rank} / {A.shape[0]}")
-                logging.debug(f"Matrix A Rank: {rank} / {A.shape[0]}")
-            except Exception as rank_e:
-                logging.error(f"Failed to compute matrix rank: {rank_e}")
+            return None, "Circuit matrix is singular or ill-conditioned."
+        logging.debug(f"solve_mna finished after {self.solver_iterations} iterations "
+                      f"(relative residual {self.solver_residual:.3e}, warm start: {x0 is not None})")
+        if not self.solver_residual <= self.iterative_tolerance:
+            logging.error(f"Iterative solver stopped at relative residual {self.solver_residual:.3e}")
+            return None, (f"Iterative solver did not converge (relative residual {self.solver_residual:.3e} "
+                          f"after {self.solver_iterations} iterations).")
+        return x, None
+
+    def compute_element_results(self, node_voltages, source_currents):
+        """
+        Compute branch voltages, currents and absorbed powers for every element in
+        one vectorized pass over element_table (passive sign convention: current
+        flows from terminal 0 to terminal 1 through the element).
+        Also returns the total absorbed power, which should be ~0, and the largest
+        KCL residual over all nodes, both useful as sanity checks in batch runs.
+        """
+        t = self.element_table
+        elements = t["elements"]
+        types, values = t["types"], t["values"]
+        row1, row2, branch = t["row1"], t["row2"], t["branch"]
+        num_nodes = len(node_voltages)
+
+        # Row -1 (ground) picks up the trailing 0 V entry.
+        v_ext = np.append(np.asarray(node_voltages, dtype=float), 0.0)
+        voltages = v_ext[row1] - v_ext[row2]
+
+        currents = np.full(len(elements), np.nan)
+        resistors = (types == 'resistor') & (values != 0)
+        currents[resistors] = voltages[resistors] / values[resistors]
+        current_sources = types == 'current_source'
+        currents[current_sources] = values[current_sources]
+        vsources = types == 'voltage_source'
+        solved = vsources & (branch >= 0) & (branch < len(source_currents))
+        currents[solved] = np.asarray(source_currents)[branch[solved]]
+        for k in np.flatnonzero(vsources & ~solved):
+            logging.error(f"Voltage Source {elements[k].name}: Simulation did not return a current value.")
+
+        powers = voltages * currents
+        flows = np.nan_to_num(currents)
+        leaving, entering = row1 >= 0, row2 >= 0
+        kcl = (np.bincount(row1[leaving], weights=flows[leaving], minlength=num_nodes)
+               - np.bincount(row2[entering], weights=flows[entering], minlength=num_nodes))
+        kcl_residual = float(np.abs(kcl).max()) if num_nodes else 0.0
+        total_power = float(np.nansum(powers))
+        logging.debug(f"Total absorbed power: {total_power:.3e} W, max KCL residual: {kcl_residual:.3e} A")
+
+        node_ids = np.fromiter(self.node_map.keys(), dtype=np.int64, count=len(self.node_map))
+        node_rows = np.fromiter(self.node_map.values(), dtype=np.int64, count=len(self.node_map))
+        return {
+            "elements": elements,
+            "position": self.element_position,
+            "names": np.array([e.name for e in elements], dtype=str),
+            "types": types,
+            "node1": np.array([-1 if e.nodes[0] is None else e.nodes[0] for e in elements], dtype=np.int64),
+            "node2": np.array([-1 if e.nodes[1] is None else e.nodes[1] for e in elements], dtype=np.int64),
+            "values": values,
+            "voltages": voltages,
+            "currents": currents,
+            "powers": powers,
+            "total_power": total_power,
+            "kcl_residual": kcl_residual,
+            "solver_residual": self.solver_residual,
+            "solver_iterations": self.solver_iterations,
+            "stats": self.last_stats,
+            "node_ids": node_ids,
+            "node_voltages": v_ext[node_rows],
+        }
+
+    def solve_circuit(self, show_errors=True):
+        """
+        Solve the matrix equation using Modified Nodal Analysis.
+        Return (node_voltages, voltage_source_currents).
+        Union-find, node ordering, floating/topology checks and the stamping pattern
+        are looked up in topology_cache first and only recomputed for new topologies.
+        With show_errors=False (worker threads) failures are only recorded in last_error.
+        Raises SimulationCancelled if cancel_event is set between phases.
+        Per-phase timings are left in last_stats (a SolveStats).
+        """
+        self.last_stats = SolveStats(self.profile_mode)
+        self.last_stats.start()
+        try:
+            return self.run_solve(show_errors)
+        finally:
+            self.last_stats.stop()
+            logging.debug(f"Solve phases:\n{self.last_stats.report()}")
+
+    def check_topology(self, show_errors):
+        """
+        Union-find, node ordering and the floating/structural checks, taken from
+        topology_cache when this topology was seen before. Returns False (with
+        last_error set) if the circuit cannot be solved.
+        """
+        stats = self.last_stats
+        self.report_progress("Merging nodes")
+        with stats.stage("topology_lookup"):
+            self.topology_key = self.topology_fingerprint()
+            cache_key = (self.topology_key, self.node_ordering)
+            self.structure = self.topology_cache.get(cache_key)
+        if self.structure is None:
+            with stats.stage("build_union_find"):
+                self.build_union_find()
+            with stats.stage("build_node_map"):
+                self.build_node_map()
+
+            self.report_progress("Checking for floating nodes")
+            with stats.stage("detect_floating_nodes"):
+                floating_nodes = self.detect_floating_nodes()
+
+            self.report_progress("Validating topology")
+            with stats.stage("validate_topology"):
+                problems = [] if floating_nodes else self.validate_topology()
+            self.structure = {
+                "uf": self.uf,
+                "node_map": self.node_map,
+                "next_node_index": self.next_node_index,
+                "floating_nodes": floating_nodes,
+                # Element names are not part of the fingerprint, so only positions are cached.
+                "floating_islands": [{"nodes": island["nodes"], "positions": island["positions"]}
+                                     for island in self.floating_islands],
+                "problems": problems,
+            }
+            self.topology_cache.put(cache_key, self.structure)
+        else:
+            logging.debug(f"Reusing cached structure for topology {self.topology_key}")
+            self.uf = self.structure["uf"]
+            self.node_map = self.structure["node_map"]
+            self.next_node_index = self.structure["next_node_index"]
+            self.floating_islands = [dict(island, elements=self.element_names(island["positions"]))
+                                     for island in self.structure["floating_islands"]]
+            floating_nodes = self.structure["floating_nodes"]
+            problems = self.structure["problems"]
+
+        if floating_nodes:
+            islands = "; ".join(", ".join(island["elements"]) for island in self.floating_islands)
+            self.last_error = f"Floating nodes detected: {sorted(floating_nodes)}"
+            if islands:
+                self.last_error += f" (not connected to ground: {islands})"
+            return False
+        if problems:
+            self.report_error("\n".join(self.format_problem(problem) for problem in problems), show_errors)
+            return False
+        return True
+
+    def run_solve(self, show_errors):
+        stats = self.last_stats
+        self.last_error = None
+        if not self.check_topology(show_errors):
+            return None, None
+
+        cache_keys = None
+        table_ready = False
+        if self.result_cache is not None and self.use_result_cache:
+            with stats.stage("result_cache"):
+                self.prepare_element_table()
+                table_ready = True
+                cache_keys = self.result_keys()
+                cached = self.result_cache.get(*cache_keys)
+            if cached is not None:
+                node_voltages, source_currents, self.last_solution = cached
+                self.last_system = None
+                self.solver_iterations = 0
+                self.solver_residual = None
+                self.report_progress("Done (cached result)")
+                return node_voltages, source_currents
+            if self.solver == "iterative":
+                warm_start = self.result_cache.near_miss(cache_keys[0])
+                if warm_start is not None:
+                    self.last_solution = warm_start
+
+        self.report_progress("Stamping matrices")
+        with stats.stage("stamp_matrices"):
+            if not table_ready:
+                self.prepare_element_table()
+            A, z, num_nodes, num_vsources = self.stamp_matrices()
+
+        if self.solver == "iterative":
+            self.report_progress("Solving linear system iteratively")
+            with stats.stage("solve"):
+                x, error = self.solve_iterative(A, z, num_vsources)
+        else:
+            self.report_progress(f"Solving {len(self.blocks)} independent block(s)")
+            with stats.stage("solve"):
+                x, error = self.solve_blocks(A, z)
+            self.solver_iterations = 0
+            self.solver_residual = float(np.linalg.norm(A @ x - z) / (np.linalg.norm(z) or 1.0)) if error is None else None
+        if error:
+            self.report_error(error, show_errors)
             return None, None
+        logging.debug(f"Solved vector x:\n{x}")
+        self.last_solution = x
+        # Kept for sensitivities(); a reduced system does not cover every node.
+        self.last_system = ({"A": A, "x": x, "blocks": self.blocks, "revision": self.revision}
+                            if self.reduction is None else None)
+        self.report_progress("Done")
 
         node_voltages = x[:num_nodes]
+        if self.reduction is not None:
+            node_voltages = self.reduction.expand(node_voltages)
         source_currents = x[num_nodes:num_nodes + num_vsources]
         logging.debug(f"Node Voltages: {node_voltages}")
         logging.debug(f"Voltage Source Currents: {source_currents}")
+        if cache_keys is not None:
+            self.result_cache.put(*cache_keys, node_voltages, source_currents, x)
 
         return node_voltages, source_currents
+
+    def solve_batch(self, values):
+        """
+        Solve the current topology for many sets of element values at once.
+        values is a (scenarios, elements) matrix whose columns follow the non-wire
+        elements of self.elements in order (element_table["ids"] afterwards).
+        The topology checks and the stamping pattern are done once (and cached as
+        for solve_circuit); the matrices of all scenarios are assembled with
+        vectorized scatter-adds and solved as stacked dense systems up to
+        BATCH_DENSE_LIMIT unknowns, beyond that with the iterative solvers spread
+        over batch_pool (a SharedBatchPool, reused by later calls; close() it when
+        done). reduce_network does not apply here.
+        Returns (node_voltages, source_currents) of shapes (scenarios, nodes) and
+        (scenarios, voltage sources), or (None, None) if the topology is invalid.
+        Rows of scenarios that failed are NaN and listed in batch_failures.
+        """
+        self.last_stats = SolveStats(self.profile_mode)
+        self.last_stats.start()
+        try:
+            return self.run_batch(values)
+        finally:
+            self.last_stats.stop()
+            logging.debug(f"Batch solve phases:\n{self.last_stats.report()}")
+
+    def run_batch(self, values):
+        stats = self.last_stats
+        self.last_error = None
+        self.batch_failures = []
+        if not self.check_topology(show_errors=False):
+            return None, None
+
+        with stats.stage("stamp_matrices"):
+            self.prepare_element_table()
+            values = np.asarray(values, dtype=float)
+            count = len(self.element_table["values"])
+            if values.ndim != 2 or values.shape[1] != count:
+                raise ValueError(f"Expected a (scenarios, {count}) value matrix, got shape {values.shape}")
+            scenarios = len(values)
+            num_nodes = self.next_node_index
+            num_vsources = len(self.voltage_sources)
+            n = num_nodes + num_vsources
+            pattern = self.stamp_pattern()
+            g = self.conductances(values)
+            rows = np.concatenate([pattern["g_rows"], pattern["b_rows"]])
+            cols = np.concatenate([pattern["g_cols"], pattern["b_cols"]])
+            vals = np.concatenate([pattern["g_signs"] * g[:, pattern["g_elems"]],
+                                   np.broadcast_to(pattern["b_vals"], (scenarios, len(pattern["b_vals"])))], axis=1)
+            index = (np.arange(scenarios)[:, None] * n + pattern["z_rows"]).ravel()
+            z = np.bincount(index, weights=(pattern["z_signs"] * values[:, pattern["z_elems"]]).ravel(),
+                            minlength=scenarios * n).astype(float).reshape(scenarios, n)
+            z[:, pattern["vs_rows"]] = values[:, pattern["vs_elems"]]
+
+        with stats.stage("solve"):
+            if n <= self.BATCH_DENSE_LIMIT:
+                x, failed = solve_dense_batch(n, rows, cols, vals, z)
+            else:
+                if self.batch_pool is None:
+                    self.batch_pool = SharedBatchPool(self.max_workers)
+                x, failed = solve_sparse_batch(n, rows, cols, vals, z, num_nodes, self.iterative_tolerance,
+                                               self.iterative_max_iter, self.batch_pool)
+        self.batch_failures = np.flatnonzero(failed).tolist()
+        if self.batch_failures:
+            self.last_error = f"{len(self.batch_failures)} of {scenarios} scenarios could not be solved."
+            logging.error(self.last_error)
+        logging.debug(f"Solved {scenarios} scenarios of {n} unknowns")
+        return x[:, :num_nodes], x[:, num_nodes:]
+
+    def sensitivities(self, outputs=None):
+        """
+        Adjoint sensitivities of node voltages to every element value, after a
+        successful solve_circuit. For each output node one transposed system
+        A^T l = e_node is solved on the forward matrix (all outputs as a single
+        multi-right-hand-side solve per diagonal block, so each block is factored
+        once); then dV/dR = (l1 - l2)(x1 - x2) / R^2 for a resistor, l[branch row]
+        for a voltage source and l2 - l1 for a current source, for all elements
+        at once. outputs are node ids (default: every non-ground node).
+        Returns {"node_ids", "element_ids", "dv"} where dv[k, j] is dV(node_ids[k])
+        / d value of element element_ids[j] (element_table order, wires
+        excluded), or None if there is no usable forward solve. Raises
+        ValueError for output ids that are not nodes of the circuit; ground and
+        nodes merged into it have zero sensitivity.
+        """
+        if self.last_system is None or self.last_system["revision"] != self.revision:
+            # Cached or reduced solves don't keep the full system; solve it again.
+            reduce_network, result_cache = self.reduce_network, self.result_cache
+            self.reduce_network, self.result_cache = False, None
+            try:
+                node_voltages, _ = self.solve_circuit(show_errors=False)
+            finally:
+                self.reduce_network, self.result_cache = reduce_network, result_cache
+            if node_voltages is None:
+                return None
+        A, x = self.last_system["A"], self.last_system["x"]
+        node_ids = np.array(sorted(self.node_map) if outputs is None else list(outputs), dtype=np.int64)
+        unknown = [node for node in node_ids.tolist() if node != 0 and node not in self.node_registry.terminals]
+        if unknown:
+            raise ValueError(f"Unknown output node: {unknown[0]}")
+        out_rows = np.array([self.node_row(node) for node in node_ids.tolist()], dtype=np.int64)
+        n = len(x)
+        E = np.zeros((n, len(node_ids)))
+        mapped = np.flatnonzero(out_rows >= 0)
+        E[out_rows[mapped], mapped] = 1.0
+
+        self.adjoint_stats = SolveStats(self.profile_mode)
+        self.adjoint_stats.start()
+        try:
+            with self.adjoint_stats.stage("adjoint_solve"):
+                lam, error = self.solve_adjoint(A, E, self.last_system["blocks"],
+                                                self.last_system.setdefault("adjoint_inverses", {}))
+        finally:
+            self.adjoint_stats.stop()
+        if error:
+            self.last_error = error
+            logging.error(error)
+            return None
+
+        t = self.element_table
+        types, row1, row2, branch = t["types"], t["row1"], t["row2"], t["branch"]
+        # Row -1 (ground) picks up the trailing zero row, as in compute_element_results.
+        lam = np.vstack([lam, np.zeros((1, len(node_ids)))])
+        x_ext = np.append(x, 0.0)
+        dv = np.zeros((len(node_ids), len(types)))
+        res = types == 'resistor'
+        g = self.conductances()[res]
+        dv[:, res] = ((lam[row1[res]] - lam[row2[res]]) * ((x_ext[row1[res]] - x_ext[row2[res]]) * g ** 2)[:, None]).T
+        vs = types == 'voltage_source'
+        dv[:, vs] = lam[self.next_node_index + branch[vs]].T
+        cs = types == 'current_source'
+        dv[:, cs] = (lam[row2[cs]] - lam[row1[cs]]).T
+        return {"node_ids": node_ids, "element_ids": t["ids"], "dv": dv}
+
+    def solve_adjoint(self, A, E, blocks, inverses):
+        """
+        Solve A^T L = E for the columns of E, block by block on the diagonal
+        blocks of the forward solve when A is dense. Each block's transposed
+        inverse is computed once and kept in inverses (stored with last_system,
+        so it lives as long as the forward system), which turns later calls
+        into matrix products. Returns (L, error message).
+        """
+        L = np.zeros(E.shape)
+        if isinstance(A, CooMatrix):
+            # MNA matrices are symmetric, so the adjoint systems use solve_mna as well.
+            num_nodes = A.shape[0] - len(self.voltage_sources)
+            for k in np.flatnonzero(E.any(axis=0)):
+                L[:, k], _, residual = solve_mna(A, E[:, k], num_nodes, tol=self.iterative_tolerance,
+                                                 max_iter=self.iterative_max_iter)
+                if not residual <= self.iterative_tolerance:
+                    return None, f"Adjoint solve did not converge (relative residual {residual:.3e})."
+            return L, None
+        if sum(len(index) for index in blocks) != len(A):
+            return None, "Adjoint solve failed: the diagonal blocks do not cover the forward system."
+        for k, index in enumerate(blocks):
+            rhs = E[index]
+            used = np.flatnonzero(rhs.any(axis=0))
+            if len(used) == 0:
+                continue
+            if k not in inverses:
+                try:
+                    inverses[k] = np.linalg.inv(A[np.ix_(index, index)].T)
+                except np.linalg.LinAlgError as e:
+                    return None, f"Adjoint solve failed: {e}"
+            L[np.ix_(index, used)] = inverses[k] @ rhs[:, used]
+        return L, None
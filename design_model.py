@@ -0,0 +1,193 @@
+import numpy as np
+
+
+# Component outlines in local coordinates (before rotation), per component type.
+SHAPE_POINTS = {
+    "resistor": np.array([(-20, 0), (-10, -10), (0, 10), (10, -10), (20, 0)], dtype=float),
+}
+
+TERMINAL_OFFSETS = {
+    "ground": [(-10, 0), (10, 0)],
+    "voltage_source": [(0, -25), (0, 25)],
+    "resistor": [(-25, 0), (25, 0)],
+    "current_source": [(-25, 0), (25, 0)],
+}
+
+
+def rotate(points, angles_deg):
+    """
+    Rotate points (..., 2) by angles_deg, which broadcasts against points[..., 0].
+    """
+    angles = np.radians(angles_deg)
+    cos_a, sin_a = np.cos(angles), np.sin(angles)
+    x, y = points[..., 0], points[..., 1]
+    return np.stack([x * cos_a - y * sin_a, x * sin_a + y * cos_a], axis=-1)
+
+
+class DesignModel:
+    """
+    Columnar geometry of the placed components, shared by the GUI and the
+    serializer. Row k holds the center, rotation and the two terminal offsets
+    of components[k]; absolute terminal positions are derived with one
+    vectorized rotation. Component dicts keep only the element, type and
+    canvas bookkeeping plus their "row" here; drawn[k] records whether the GUI
+    has materialized components[k] on the canvas. Removal swaps the last row
+    into the hole, so rows stay dense.
+    """
+    def __init__(self, capacity=64):
+        self.components = []
+        self.centers = np.zeros((capacity, 2))
+        self.rotations = np.zeros(capacity)
+        self.terminal_offsets = np.zeros((capacity, 2, 2))
+        self.abs_terminals = np.zeros((capacity, 2, 2))
+        # Ground terminals are not rotated with the symbol.
+        self.rotates = np.ones(capacity, dtype=bool)
+        self.drawn = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return len(self.components)
+
+    def grow(self, needed):
+        capacity = len(self.rotations)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity)
+        for name in ("centers", "rotations", "terminal_offsets", "abs_terminals", "rotates", "drawn"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, comp_dict, center, rotation=0, terminals=None):
+        row = len(self.components)
+        self.grow(row + 1)
+        comp_dict["row"] = row
+        self.components.append(comp_dict)
+        self.centers[row] = center
+        self.rotations[row] = rotation
+        self.terminal_offsets[row] = terminals if terminals is not None else TERMINAL_OFFSETS[comp_dict["comp_type"]]
+        self.rotates[row] = comp_dict["comp_type"] != "ground"
+        self.drawn[row] = False
+        self.update_terminals([row])
+        return row
+
+    def remove(self, comp_dict):
+        row = comp_dict["row"]
+        last = len(self.components) - 1
+        if row != last:
+            moved = self.components[last]
+            self.components[row] = moved
+            moved["row"] = row
+            for name in ("centers", "rotations", "terminal_offsets", "abs_terminals", "rotates", "drawn"):
+                column = getattr(self, name)
+                column[row] = column[last]
+        self.components.pop()
+        comp_dict["row"] = None
+
+    def clear(self):
+        self.components.clear()
+
+    def update_terminals(self, rows=None):
+        """
+        Recompute absolute terminal positions for the given rows (all if None).
+        """
+        rows = np.arange(len(self.components)) if rows is None else np.asarray(rows, dtype=np.int64)
+        angles = np.where(self.rotates[rows], self.rotations[rows], 0.0)
+        self.abs_terminals[rows] = self.centers[rows, None, :] + rotate(self.terminal_offsets[rows], angles[:, None])
+
+    def move(self, rows, dx, dy, grid=None):
+        rows = np.asarray(rows, dtype=np.int64)
+        centers = self.centers[rows] + (dx, dy)
+        if grid:
+            centers = np.round(centers / grid) * grid
+        self.centers[rows] = centers
+        self.update_terminals(rows)
+
+    def rotate_rows(self, rows, angle_deg):
+        rows = np.asarray(rows, dtype=np.int64)
+        self.rotations[rows] = (self.rotations[rows] + angle_deg) % 360
+        self.update_terminals(rows)
+
+    def center(self, comp_dict):
+        x, y = self.centers[comp_dict["row"]]
+        return float(x), float(y)
+
+    def rotation(self, comp_dict):
+        return float(self.rotations[comp_dict["row"]])
+
+    def terminals(self, comp_dict):
+        """
+        Absolute terminal positions of one component as a list of (x, y).
+        """
+        return [tuple(p) for p in self.abs_terminals[comp_dict["row"]].tolist()]
+
+    def terminal(self, comp_dict, index):
+        x, y = self.abs_terminals[comp_dict["row"], index]
+        return float(x), float(y)
+
+    def shape(self, comp_dict):
+        """
+        Outline points of a component, rotated and translated to world coordinates.
+        """
+        points = SHAPE_POINTS.get(comp_dict["comp_type"])
+        if points is None:
+            return []
+        row = comp_dict["row"]
+        return (self.centers[row] + rotate(points, self.rotations[row])).tolist()
+
+    def box_mask(self, x1, y1, x2, y2):
+        """
+        Boolean mask over the rows whose center lies inside the box.
+        """
+        centers = self.centers[:len(self.components)]
+        return ((centers[:, 0] >= x1) & (centers[:, 0] <= x2) &
+                (centers[:, 1] >= y1) & (centers[:, 1] <= y2))
+
+    def in_box(self, x1, y1, x2, y2):
+        """
+        Components whose center lies inside the box, as one array mask.
+        """
+        return [self.components[row] for row in np.flatnonzero(self.box_mask(x1, y1, x2, y2))]
+
+    def segments_in_box(self, ends, x1, y1, x2, y2):
+        """
+        Mask over segments between terminals whose bounding box overlaps the
+        box; ends is an (n, 4) array of (row1, terminal1, row2, terminal2).
+        """
+        a = self.abs_terminals[ends[:, 0], ends[:, 1]]
+        b = self.abs_terminals[ends[:, 2], ends[:, 3]]
+        return ((np.minimum(a[:, 0], b[:, 0]) <= x2) & (np.maximum(a[:, 0], b[:, 0]) >= x1) &
+                (np.minimum(a[:, 1], b[:, 1]) <= y2) & (np.maximum(a[:, 1], b[:, 1]) >= y1))
+
+    def to_state(self):
+        """
+        Serializable columns plus the per-component records without canvas items.
+        """
+        n = len(self.components)
+        return {
+            "centers": self.centers[:n].copy(),
+            "rotations": self.rotations[:n].copy(),
+            "terminal_offsets": self.terminal_offsets[:n].copy(),
+            "records": [{key: value for key, value in comp.items()
+                         if key not in ("row", "canvas_items", "terminal_dot_ids")}
+                        for comp in self.components],
+        }
+
+    def extend(self, records, centers, rotations, terminal_offsets):
+        """
+        Append many components at once (a loaded chunk). terminal_offsets entries
+        may be None for the type's default terminals.
+        """
+        start = len(self.components)
+        rows = np.arange(start, start + len(records))
+        self.grow(start + len(records))
+        for row, comp, terminals in zip(rows.tolist(), records, terminal_offsets):
+            comp["row"] = row
+            self.terminal_offsets[row] = terminals if terminals is not None else TERMINAL_OFFSETS[comp["comp_type"]]
+            self.rotates[row] = comp["comp_type"] != "ground"
+        self.components.extend(records)
+        self.centers[rows] = np.asarray(centers, dtype=float).reshape(-1, 2)
+        self.rotations[rows] = rotations
+        self.drawn[rows] = False
+        self.update_terminals(rows)
+        return records
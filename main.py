@@ -1,6 +1,46 @@
-from circuit_gui import CircuitGUI
+import logging
+import os
+import sys
+
+
+def solve_headless(path, use_cache=True):
+    """
+    Solve a saved circuit and print node voltages and source currents.
+    Only the engine is imported: no tkinter, no GUI construction. Results go
+    through the same on-disk ResultCache as the GUI unless use_cache is False.
+    """
+    from netlist_io import read_circuit_state, build_simulator
+    simulator, _ = build_simulator(read_circuit_state(path))
+    if use_cache:
+        from result_cache import ResultCache
+        try:
+            simulator.result_cache = ResultCache(os.path.join(os.path.expanduser("~"), ".circuit_simulator", "results"))
+        except OSError as e:
+            logging.error(f"Result cache disabled: {e}")
+    node_voltages, source_currents = simulator.solve_circuit(show_errors=False)
+    if node_voltages is None:
+        print(f"Simulation failed: {simulator.last_error}", file=sys.stderr)
+        return 1
+    for node_id, row in sorted(simulator.node_map.items()):
+        print(f"V({node_id}) = {node_voltages[row]:.7f} V")
+    for vs, current in zip(simulator.voltage_sources, source_currents):
+        print(f"I({vs.name}) = {current:.7e} A")
+    return 0
+
 
 if __name__ == "__main__":
+    # python main.py --solve FILE [--no-cache]
+    args = sys.argv[1:]
+    if args[:1] == ["--solve"] and len(args) in (2, 3) and args[2:] in ([], ["--no-cache"]):
+        sys.exit(solve_headless(args[1], use_cache="--no-cache" not in args))
+
+    logging.basicConfig(
+        level=logging.DEBUG,
+        filename='circuit_simulator.log',
+        filemode='w',
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    from circuit_gui import CircuitGUI
     app = CircuitGUI()
     app.geometry("1200x800")
     app.mainloop()
@@ -0,0 +1,116 @@
+import numpy as np
+
+from circuit_elements import CircuitElement
+from circuit_simulator import CircuitSimulator
+
+
+class NetlistBuilder:
+    """
+    Builds large netlists in code from bulk arrays instead of placing
+    components one at a time. Rows are kept in columns (type code, both node
+    ids, value, optional name), so generators can append millions of elements
+    with a few array copies. Like DesignModel, removal swaps the last row into
+    the hole. build() turns the rows into elements in one pass and adds them to
+    a CircuitSimulator with add_elements, ready for solve_circuit. Node 0 is
+    ground; elements are connected by sharing node ids, so no wires are needed.
+    """
+    TYPES = ("resistor", "voltage_source", "current_source")
+    PREFIXES = {"resistor": "R", "voltage_source": "V", "current_source": "I"}
+
+    def __init__(self, capacity=1024):
+        self.count = 0
+        self.types = np.zeros(capacity, dtype=np.int8)
+        self.nodes = np.zeros((capacity, 2), dtype=np.int64)
+        self.values = np.zeros(capacity)
+        self.names = {}  # row -> explicit name; other rows are named by build()
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, needed):
+        capacity = len(self.values)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity)
+        for name in ("types", "nodes", "values"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def type_codes(self, types):
+        types = np.asarray(types)
+        if types.dtype.kind in "iu":
+            codes = types.astype(np.int8)
+            if codes.size and (codes.min() < 0 or codes.max() >= len(self.TYPES)):
+                raise ValueError(f"Element type codes must be in 0..{len(self.TYPES) - 1}")
+            return codes
+        uniques, inverse = np.unique(types, return_inverse=True)
+        lookup = {name: code for code, name in enumerate(self.TYPES)}
+        unknown = [name for name in uniques.tolist() if name not in lookup]
+        if unknown:
+            raise ValueError(f"Unknown element type: {unknown[0]}")
+        return np.array([lookup[name] for name in uniques.tolist()], dtype=np.int8)[inverse.ravel()]
+
+    def add(self, element_type, node1, node2, value, name=None):
+        return int(self.add_many([element_type], [(node1, node2)], [value],
+                                 None if name is None else [name])[0])
+
+    def add_many(self, types, nodes, values, names=None):
+        """
+        Append len(values) elements. types holds type names (see TYPES) or their
+        indices, nodes is (count, 2) node ids. Returns the new rows.
+        """
+        codes = self.type_codes(types)
+        nodes = np.asarray(nodes, dtype=np.int64).reshape(-1, 2)
+        values = np.asarray(values, dtype=float).ravel()
+        if not (len(codes) == len(nodes) == len(values)):
+            raise ValueError("types, nodes and values must have the same length")
+        if nodes.size and nodes.min() < 0:
+            raise ValueError("Node ids must be non-negative (0 is ground)")
+        rows = np.arange(self.count, self.count + len(values))
+        self.grow(self.count + len(values))
+        self.types[rows] = codes
+        self.nodes[rows] = nodes
+        self.values[rows] = values
+        if names is not None:
+            self.names.update(zip(rows.tolist(), names))
+        self.count += len(values)
+        return rows
+
+    def remove(self, row):
+        """
+        Delete a row in O(1) by moving the last row into it.
+        """
+        last = self.count - 1
+        if not 0 <= row <= last:
+            raise IndexError(f"Row {row} out of range")
+        self.names.pop(row, None)
+        if row != last:
+            self.types[row] = self.types[last]
+            self.nodes[row] = self.nodes[last]
+            self.values[row] = self.values[last]
+            if last in self.names:
+                self.names[row] = self.names.pop(last)
+        self.count = last
+
+    def clear(self):
+        self.count = 0
+        self.names = {}
+
+    def build(self, simulator=None):
+        """
+        Add the rows to simulator (a new CircuitSimulator if None) as elements
+        and return it. Unnamed rows get the type prefix and their row number.
+        """
+        simulator = CircuitSimulator() if simulator is None else simulator
+        types = [self.TYPES[code] for code in self.types[:self.count].tolist()]
+        elements = []
+        for row, (element_type, value, (node1, node2)) in enumerate(
+                zip(types, self.values[:self.count].tolist(), self.nodes[:self.count].tolist())):
+            name = self.names.get(row)
+            element = CircuitElement(name or f"{self.PREFIXES[element_type]}{row}", value, element_type)
+            element.nodes = [node1, node2]
+            elements.append(element)
+        simulator.add_elements(elements)
+        return simulator
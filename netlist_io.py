@@ -0,0 +1,117 @@
+import logging
+import pickle
+
+import numpy as np
+
+from circuit_elements import Wire
+from circuit_simulator import CircuitSimulator
+
+
+CHUNK_SIZE = 5000
+
+
+def write_circuit(path, design_state, wires, comp_index, chunk_size=CHUNK_SIZE):
+    """
+    Save a circuit as a stream of pickled chunks: a header, then component
+    chunks (DesignModel.to_state() columns sliced to chunk_size rows), then
+    wire chunks. Readers can build the netlist chunk by chunk (iter_circuit_chunks).
+    """
+    records = design_state["records"]
+    with open(path, "wb") as f:
+        pickle.dump({"format": "chunked", "version": 3, "comp_index": comp_index,
+                     "components": len(records), "wires": len(wires)}, f)
+        for start in range(0, len(records), chunk_size):
+            stop = start + chunk_size
+            pickle.dump({"kind": "components",
+                         "records": records[start:stop],
+                         "centers": design_state["centers"][start:stop],
+                         "rotations": design_state["rotations"][start:stop],
+                         "terminal_offsets": design_state["terminal_offsets"][start:stop]}, f)
+        for start in range(0, len(wires), chunk_size):
+            pickle.dump({"kind": "wires", "wires": wires[start:start + chunk_size]}, f)
+
+
+def legacy_chunks(circuit_state):
+    """
+    The chunks of a file saved as one pickled dict, either with a "design"
+    entry or as the older list of per-component dicts.
+    """
+    if "design" in circuit_state:
+        components = dict(circuit_state["design"], kind="components")
+    else:
+        comps = circuit_state["components"]
+        components = {
+            "kind": "components",
+            "records": [{key: value for key, value in comp.items()
+                         if key not in ("center", "rotation", "shape_points", "terminals", "abs_terminals")}
+                        for comp in comps],
+            "centers": np.array([comp["center"] for comp in comps], dtype=float).reshape(-1, 2),
+            "rotations": np.array([comp.get("rotation", 0) for comp in comps], dtype=float),
+            "terminal_offsets": [comp.get("terminals") for comp in comps],
+        }
+    yield {"format": "legacy", "comp_index": circuit_state.get("comp_index"),
+           "components": len(components["records"]), "wires": len(circuit_state["wires"])}
+    yield components
+    yield {"kind": "wires", "wires": circuit_state["wires"]}
+
+
+def iter_circuit_chunks(path):
+    """
+    Yield the header and then the component and wire chunks of a saved circuit,
+    reading one chunk from disk at a time. Older single-dict files are yielded
+    in the same shape.
+    """
+    with open(path, "rb") as f:
+        first = pickle.load(f)
+        if first.get("format") != "chunked":
+            yield from legacy_chunks(first)
+            return
+        yield first
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def read_circuit_state(path):
+    """
+    Whole circuit as one dict {"comp_index", "records", "centers", "rotations",
+    "terminal_offsets", "wires"}, assembled from the chunk stream.
+    """
+    chunks = iter_circuit_chunks(path)
+    header = next(chunks)
+    state = {"comp_index": header.get("comp_index"), "records": [], "centers": [], "rotations": [],
+             "terminal_offsets": [], "wires": []}
+    for chunk in chunks:
+        if chunk["kind"] == "components":
+            state["records"].extend(chunk["records"])
+            state["centers"].extend(chunk["centers"])
+            state["rotations"].extend(chunk["rotations"])
+            state["terminal_offsets"].extend(chunk["terminal_offsets"])
+        else:
+            state["wires"].extend(chunk["wires"])
+    return state
+
+
+def build_simulator(circuit_state):
+    """
+    Netlist of a saved circuit without any GUI: elements are added in saved
+    order, then one Wire per saved wire, bound to the component records.
+    Returns (simulator, records).
+    """
+    simulator = CircuitSimulator()
+    records = [dict(comp) for comp in circuit_state["records"]]
+    simulator.add_elements([comp["element"] for comp in records if comp.get("element") is not None])
+    wires = []
+    for wire_data in circuit_state["wires"]:
+        try:
+            comp1 = records[wire_data["comp1_index"]]
+            comp2 = records[wire_data["comp2_index"]]
+        except IndexError:
+            logging.error("Error loading wire: component index out of range.")
+            continue
+        wires.append(Wire(wire_data["name"], comp1, wire_data["term1_idx"],
+                          comp2, wire_data["term2_idx"], None))
+    simulator.add_elements(wires)
+    return simulator, records
@@ -0,0 +1,92 @@
+import logging
+
+import numpy as np
+
+
+class NetworkReduction:
+    """
+    Exact pre-solve reduction of the resistor network.
+    Parallel resistors are summed into one conductance per node pair, then every
+    source-free node with at most two distinct neighbours is eliminated: a series
+    node becomes one equivalent resistor between its neighbours, a dangling node
+    is dropped. Eliminations are recorded so expand() can rebuild every original
+    node voltage from the reduced solution (branch currents then follow from
+    the node voltages as usual).
+    Rows are MNA node rows; -1 stands for ground.
+    """
+    def __init__(self, num_nodes, row1, row2, conductances, pinned_rows):
+        self.num_nodes = num_nodes
+        self.adjacency = [dict() for _ in range(num_nodes)]
+        for a, b, g in zip(row1.tolist(), row2.tolist(), conductances.tolist()):
+            if a == b:
+                continue
+            if a >= 0:
+                self.adjacency[a][b] = self.adjacency[a].get(b, 0.0) + g
+            if b >= 0:
+                self.adjacency[b][a] = self.adjacency[b].get(a, 0.0) + g
+        self.pinned = np.zeros(num_nodes, dtype=bool)
+        self.pinned[pinned_rows] = True
+        self.alive = np.ones(num_nodes, dtype=bool)
+        # (node, neighbour_i, neighbour_j, weight_i, weight_j): V = wi*V[i] + wj*V[j]
+        self.records = []
+        self.reduce()
+
+        self.kept = np.flatnonzero(self.alive)
+        self.new_index = np.full(num_nodes, -1, dtype=np.int64)
+        self.new_index[self.kept] = np.arange(len(self.kept))
+        logging.debug(f"Network reduction kept {len(self.kept)} of {num_nodes} nodes")
+
+    def reduce(self):
+        adjacency = self.adjacency
+        stack = [k for k in range(self.num_nodes) if not self.pinned[k] and len(adjacency[k]) <= 2]
+        while stack:
+            k = stack.pop()
+            neighbors = adjacency[k]
+            if not self.alive[k] or not neighbors or len(neighbors) > 2:
+                continue
+            if len(neighbors) == 1:
+                (i, _), = neighbors.items()
+                j, wi, wj = -1, 1.0, 0.0
+                if i >= 0:
+                    del adjacency[i][k]
+            else:
+                (i, gi), (j, gj) = neighbors.items()
+                g = gi * gj / (gi + gj)
+                wi, wj = gi / (gi + gj), gj / (gi + gj)
+                for a, b in ((i, j), (j, i)):
+                    if a >= 0:
+                        del adjacency[a][k]
+                        adjacency[a][b] = adjacency[a].get(b, 0.0) + g
+            self.records.append((k, i, j, wi, wj))
+            self.alive[k] = False
+            adjacency[k] = {}
+            for m in (i, j):
+                if m >= 0 and self.alive[m] and not self.pinned[m] and len(adjacency[m]) <= 2:
+                    stack.append(m)
+
+    def conductance_stamps(self):
+        """
+        COO (rows, cols, values) of the reduced conductance matrix in reduced indices.
+        """
+        rows, cols, vals = [], [], []
+        for a in self.kept.tolist():
+            na = self.new_index[a]
+            for b, g in self.adjacency[a].items():
+                rows.append(na)
+                cols.append(na)
+                vals.append(g)
+                if b >= 0:
+                    rows.append(na)
+                    cols.append(self.new_index[b])
+                    vals.append(-g)
+        return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64), np.asarray(vals, dtype=float)
+
+    def expand(self, reduced_voltages):
+        """
+        Full node-voltage vector (original node_map order) from the reduced solution.
+        """
+        v = np.zeros(self.num_nodes + 1)  # trailing entry is ground, reached by index -1
+        v[self.kept] = reduced_voltages
+        for k, i, j, wi, wj in reversed(self.records):
+            v[k] = wi * v[i] + wj * v[j]
+        return v[:self.num_nodes]
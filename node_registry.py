@@ -0,0 +1,71 @@
+from circuit_elements import CircuitElement
+
+
+class NodeRegistry:
+    """
+    Terminal node ids of a netlist's elements. Every node keeps the set of
+    (element, terminal index) pairs labelled with it, so joining two nodes
+    relabels only the smaller set (union by size) instead of scanning every
+    element. New ids come from a counter that only ever increases; ground is 0
+    and always survives a merge. Wires are not registered, their nodes come
+    from the components they connect.
+    """
+    def __init__(self):
+        self.terminals = {}
+        self.next_node = 1
+
+    def clear(self):
+        self.terminals = {}
+        self.next_node = 1
+
+    def new_node(self):
+        node = self.next_node
+        self.next_node += 1
+        return node
+
+    def register(self, element):
+        """
+        Track the terminals of an element that already carries node ids.
+        """
+        if element.element_type == 'wire':
+            return
+        for index, node in enumerate(element.nodes):
+            if node is not None:
+                self.terminals.setdefault(node, set()).add((element, index))
+                if node >= self.next_node:
+                    self.next_node = node + 1
+
+    def unregister(self, element):
+        if element.element_type == 'wire':
+            return
+        for index, node in enumerate(element.nodes):
+            refs = self.terminals.get(node)
+            if refs is None:
+                continue
+            refs.discard((element, index))
+            if not refs:
+                del self.terminals[node]
+
+    def assign(self, element, index, node):
+        """
+        Label an unconnected terminal with node.
+        """
+        element.nodes[index] = node
+        self.terminals.setdefault(node, set()).add((element, index))
+        CircuitElement.nodes_changed()
+
+    def merge(self, node1, node2):
+        """
+        Join two nodes and return the id that survives.
+        """
+        if node1 == node2:
+            return node1
+        keep, drop = node1, node2
+        if drop == 0 or (keep != 0 and len(self.terminals.get(keep, ())) < len(self.terminals.get(drop, ()))):
+            keep, drop = drop, keep
+        moved = self.terminals.pop(drop, set())
+        for element, index in moved:
+            element.nodes[index] = keep
+        self.terminals.setdefault(keep, set()).update(moved)
+        CircuitElement.nodes_changed()
+        return keep
@@ -0,0 +1,98 @@
+import glob
+import logging
+import os
+import threading
+
+import numpy as np
+
+
+class ResultCache:
+    """
+    Persistent on-disk cache of solved circuits. Each entry is one .npz file
+    named "<structure key>-<content key>.npz" holding the node voltages, the
+    voltage-source currents and the raw MNA solution. The structure key only
+    covers topology, so entries sharing it with a new circuit are near misses
+    whose solution can warm-start an iterative solve.
+    Least recently used files (by mtime, refreshed on every hit) are deleted
+    once the directory grows past max_bytes.
+    """
+    def __init__(self, directory, max_bytes=512 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, structure_key, content_key):
+        return os.path.join(self.directory, f"{structure_key}-{content_key}.npz")
+
+    def get(self, structure_key, content_key):
+        """
+        Returns (node_voltages, source_currents, solution) or None.
+        """
+        path = self.path(structure_key, content_key)
+        try:
+            with np.load(path) as entry:
+                result = entry["node_voltages"], entry["source_currents"], entry["solution"]
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        logging.debug(f"Result cache hit: {os.path.basename(path)}")
+        return result
+
+    def near_miss(self, structure_key):
+        """
+        Solution vector of the most recently used entry with the same topology, or None.
+        """
+        candidates = glob.glob(os.path.join(self.directory, f"{structure_key}-*.npz"))
+        for path in sorted(candidates, key=os.path.getmtime, reverse=True):
+            try:
+                with np.load(path) as entry:
+                    return entry["solution"]
+            except (OSError, KeyError, ValueError):
+                continue
+        return None
+
+    def put(self, structure_key, content_key, node_voltages, source_currents, solution):
+        path = self.path(structure_key, content_key)
+        # Write under a temporary name so a concurrent reader never sees a partial file.
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "wb") as f:
+                np.savez(f, node_voltages=node_voltages, source_currents=source_currents, solution=solution)
+            os.replace(temporary, path)
+        except OSError as e:
+            logging.error(f"Could not write result cache entry {path}: {e}")
+            return
+        self.evict()
+
+    def evict(self):
+        with self.lock:
+            entries = []
+            for path in glob.glob(os.path.join(self.directory, "*.npz")):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                logging.debug(f"Evicted {os.path.basename(path)} from result cache")
+
+    def clear(self):
+        with self.lock:
+            for path in glob.glob(os.path.join(self.directory, "*.npz")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
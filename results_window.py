@@ -0,0 +1,152 @@
+from imports import *
+
+
+class LazyTable(ttk.Frame):
+    """
+    A ttk.Treeview backed by column arrays that only materializes rows as they
+    are scrolled into view. Sorting and filtering permute an index array and
+    reload the first page, so the cost of opening the table does not depend on
+    the number of rows.
+    """
+    PAGE_SIZE = 200
+
+    def __init__(self, master, columns, data, filter_key):
+        """
+        columns: list of (key, heading, format) tuples.
+        data: dict mapping each key to an array with one entry per row.
+        filter_key: key of the column matched against the filter text.
+        """
+        super().__init__(master)
+        self.columns = columns
+        self.data = data
+        self.search_keys = np.char.lower(np.asarray(data[filter_key], dtype=str))
+        self.row_count = len(self.search_keys)
+        self.visible = np.arange(self.row_count)
+        self.order = self.visible
+        self.sort_key = None
+        self.sort_descending = False
+        self.loaded = 0
+
+        self.filter_text = tk.StringVar()
+        filter_frame = ttk.Frame(self)
+        filter_frame.pack(fill=tk.X)
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+        entry = ttk.Entry(filter_frame, textvariable=self.filter_text)
+        entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=4)
+        entry.bind("<Return>", lambda e: self.apply_filter())
+        self.count_label = ttk.Label(filter_frame)
+        self.count_label.pack(side=tk.RIGHT)
+
+        keys = [key for key, _, _ in columns]
+        self.tree = ttk.Treeview(self, columns=keys, show="headings", height=20)
+        for key, heading, _ in columns:
+            self.tree.heading(key, text=heading, command=lambda k=key: self.sort_by(k))
+            self.tree.column(key, width=110, anchor="w")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.reload()
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9 and self.loaded < len(self.order):
+            self.load_more()
+
+    def load_more(self):
+        stop = min(self.loaded + self.PAGE_SIZE, len(self.order))
+        for row in self.order[self.loaded:stop]:
+            values = [fmt.format(self.data[key][row]) for key, _, fmt in self.columns]
+            self.tree.insert("", tk.END, values=values)
+        self.loaded = stop
+
+    def reload(self):
+        self.tree.delete(*self.tree.get_children())
+        self.loaded = 0
+        self.load_more()
+        self.count_label.configure(text=f"{len(self.order)} / {self.row_count} rows")
+
+    def sort_by(self, key):
+        if self.sort_key == key:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_key = key
+            self.sort_descending = False
+        self.apply_sort()
+        self.reload()
+
+    def apply_sort(self):
+        if self.sort_key is None:
+            self.order = self.visible
+            return
+        ranks = np.argsort(np.asarray(self.data[self.sort_key])[self.visible], kind="stable")
+        if self.sort_descending:
+            ranks = ranks[::-1]
+        self.order = self.visible[ranks]
+
+    def apply_filter(self):
+        text = self.filter_text.get().strip().lower()
+        if text:
+            self.visible = np.flatnonzero(np.char.find(self.search_keys, text) >= 0)
+        else:
+            self.visible = np.arange(self.row_count)
+        self.apply_sort()
+        self.reload()
+
+
+class ResultsWindow(tk.Toplevel):
+    """
+    Simulation results shown as sortable, filterable lazy tables.
+    Expects the dict returned by CircuitSimulator.compute_element_results.
+    """
+    def __init__(self, master, results):
+        super().__init__(master)
+        self.title("Simulation Results")
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill=tk.BOTH, expand=True)
+
+        node_table = LazyTable(notebook, [
+            ("node_ids", "Node", "{}"),
+            ("node_voltages", "Voltage (V)", "{:.7f}"),
+        ], results, filter_key="node_ids")
+        notebook.add(node_table, text="Node Voltages")
+
+        element_table = LazyTable(notebook, [
+            ("names", "Name", "{}"),
+            ("types", "Type", "{}"),
+            ("node1", "Node 1", "{}"),
+            ("node2", "Node 2", "{}"),
+            ("values", "Value", "{:g}"),
+            ("voltages", "V (V)", "{:.7f}"),
+            ("currents", "I (A)", "{:.3e}"),
+            ("powers", "P (W)", "{:.3e}"),
+        ], results, filter_key="names")
+        notebook.add(element_table, text="Elements")
+
+        stats = results.get("stats")
+        if stats is not None and stats.stages:
+            phases = list(stats.stages)
+            timing_table = LazyTable(notebook, [
+                ("phase", "Phase", "{}"),
+                ("seconds", "Time (s)", "{:.4f}"),
+                ("calls", "Calls", "{}"),
+                ("peak_mb", "Peak (MB)", "{:.2f}"),
+            ], {
+                "phase": np.array(phases, dtype=str),
+                "seconds": np.array([stats.stages[p]["seconds"] for p in phases]),
+                "calls": np.array([stats.stages[p]["calls"] for p in phases]),
+                "peak_mb": np.array([np.nan if stats.stages[p]["peak_bytes"] is None
+                                     else stats.stages[p]["peak_bytes"] / 2**20 for p in phases]),
+            }, filter_key="phase")
+            notebook.add(timing_table, text="Timing")
+
+        summary = (f"Total absorbed power: {results['total_power']:.3e} W    "
+                   f"Max KCL residual: {results['kcl_residual']:.3e} A")
+        if results.get("solver_residual") is not None:
+            summary += f"    Solver residual: {results['solver_residual']:.3e}"
+        if results.get("solver_iterations"):
+            summary += f" ({results['solver_iterations']} iterations)"
+        if stats is not None:
+            summary += f"    Solve time: {stats.total():.3f} s"
+        ttk.Label(self, text=summary).pack(anchor="w", padx=4, pady=2)
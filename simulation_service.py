@@ -0,0 +1,283 @@
+"""
+Long-lived local simulation service.
+
+Accepts netlists over localhost HTTP or a Unix socket and returns the solved
+node voltages and source currents as JSON. Simulators, their topology cache
+and the batch process pool stay warm between requests, and concurrent
+requests for the same topology are solved together in one solve_batch call:
+
+    python simulation_service.py --port 8765
+    python simulation_service.py --unix /tmp/circuit.sock
+    python simulation_service.py --client save1.ckt --port 8765
+
+POST /solve takes either JSON {"types": [...], "nodes": [[n1, n2], ...],
+"values": [...], "names": [...] (optional)} or, with Content-Type
+application/octet-stream, an .npz archive of the same arrays. Node 0 is
+ground; see NetlistBuilder for the element types.
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from batch_solver import SharedBatchPool
+from netlist_builder import NetlistBuilder
+from topology_cache import TopologyCache
+
+
+def parse_netlist(body, content_type):
+    """
+    Columns of a request body as {"types", "nodes", "values", "names"}, with
+    types turned into NetlistBuilder type codes. Archives are loaded with
+    allow_pickle=False, so a request cannot run code.
+    """
+    if content_type.startswith("application/octet-stream"):
+        with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+            netlist = {key: archive[key] for key in archive.files}
+    else:
+        netlist = json.loads(body)
+        if not isinstance(netlist, dict):
+            raise ValueError("the body must be a JSON object")
+        for key in ("types", "nodes", "values", "names"):
+            if netlist.get(key) is not None and not isinstance(netlist[key], list):
+                raise ValueError(f"{key} must be a list")
+    types = NetlistBuilder().type_codes(netlist["types"])
+    nodes = np.asarray(netlist["nodes"], dtype=np.int64).reshape(-1, 2)
+    values = np.asarray(netlist["values"], dtype=float).ravel()
+    names = netlist.get("names")
+    if not (len(types) == len(nodes) == len(values)):
+        raise ValueError("types, nodes and values must have the same length")
+    if names is not None and len(names) != len(types):
+        raise ValueError("names must have one entry per element")
+    if nodes.size and nodes.min() < 0:
+        raise ValueError("node ids must be non-negative")
+    if not np.isfinite(values).all():
+        raise ValueError("values must be finite")
+    return {"types": types, "nodes": nodes, "values": values,
+            "names": None if names is None else [str(name) for name in names]}
+
+
+def topology_key(netlist):
+    key = hashlib.blake2b(digest_size=16)
+    key.update(netlist["types"].tobytes())
+    key.update(netlist["nodes"].tobytes())
+    if netlist["names"] is not None:
+        key.update("\0".join(netlist["names"]).encode())
+    return key.hexdigest()
+
+
+class SimulationService:
+    """
+    Solves netlists for the request handlers. One simulator per recently seen
+    topology is kept (bounded LRU, like TopologyCache) together with a shared
+    topology cache and SharedBatchPool. Requests for the same topology that
+    arrive within BATCH_WINDOW seconds of each other are stacked into one
+    (requests, elements) value matrix and solved with a single solve_batch
+    call on the solver thread, which also keeps the simulators single-threaded.
+    """
+    BATCH_WINDOW = 0.005
+
+    def __init__(self, max_workers=None, max_simulators=32):
+        self.topology_cache = TopologyCache()
+        self.batch_pool = SharedBatchPool(max_workers)
+        self.max_simulators = max_simulators
+        self.simulators = OrderedDict()
+        self.pending = {}
+        self.solver_thread = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.requests = 0
+
+    def simulator_for(self, key, netlist):
+        simulator = self.simulators.get(key)
+        if simulator is None:
+            builder = NetlistBuilder(capacity=max(1, len(netlist["values"])))
+            builder.add_many(netlist["types"], netlist["nodes"], netlist["values"], netlist["names"])
+            simulator = builder.build()
+            simulator.topology_cache = self.topology_cache
+            simulator.batch_pool = self.batch_pool
+            self.simulators[key] = simulator
+            while len(self.simulators) > self.max_simulators:
+                self.simulators.popitem(last=False)
+        self.simulators.move_to_end(key)
+        return simulator
+
+    async def solve(self, netlist):
+        """
+        Result of one netlist as a JSON-ready dict, possibly solved together
+        with other requests of the same topology.
+        """
+        loop = asyncio.get_running_loop()
+        key = topology_key(netlist)
+        future = loop.create_future()
+        batch = self.pending.get(key)
+        if batch is None:
+            batch = self.pending[key] = []
+            loop.call_later(self.BATCH_WINDOW, self.flush, key, netlist)
+        batch.append((netlist["values"], future))
+        self.requests += 1
+        return await future
+
+    def flush(self, key, netlist):
+        batch = self.pending.pop(key)
+        self.batches += 1
+        task = asyncio.get_running_loop().run_in_executor(
+            self.solver_thread, self.solve_group, key, netlist, np.stack([values for values, _ in batch]))
+        task.add_done_callback(lambda done: self.deliver(batch, done))
+
+    def deliver(self, batch, done):
+        error = done.exception()
+        results = None if error is not None else done.result()
+        for k, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_result({"error": f"Solver failed: {error}"})
+            else:
+                future.set_result(results[k])
+
+    def solve_group(self, key, netlist, values):
+        """
+        Solve a stack of value sets for one topology; runs on the solver thread.
+        """
+        simulator = self.simulator_for(key, netlist)
+        node_voltages, source_currents = simulator.solve_batch(values)
+        if node_voltages is None:
+            return [{"error": simulator.last_error}] * len(values)
+        nodes = sorted(simulator.node_map.items())
+        names = [vs.name for vs in simulator.voltage_sources]
+        failed = set(simulator.batch_failures)
+        results = []
+        for k in range(len(values)):
+            if k in failed:
+                results.append({"error": "The circuit matrix is singular or the solver did not converge."})
+                continue
+            results.append({
+                "node_voltages": {str(node): float(node_voltages[k, row]) for node, row in nodes},
+                "source_currents": dict(zip(names, source_currents[k].tolist())),
+                "batch_size": len(values),
+            })
+        return results
+
+    async def handle(self, reader, writer):
+        """
+        One HTTP/1.1 request per connection: POST /solve or GET /health.
+        """
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            method, path = request_line[0], request_line[1]
+            if method == "GET" and path == "/health":
+                status, payload = 200, {"status": "ok", "requests": self.requests, "batches": self.batches,
+                                        "topologies": len(self.simulators)}
+            elif method == "POST" and path == "/solve":
+                payload = await self.solve(parse_netlist(body, headers.get("content-type", "")))
+                status = 422 if "error" in payload else 200
+            else:
+                status, payload = 404, {"error": f"No route for {method} {path}"}
+        except (ValueError, TypeError, KeyError, IndexError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": f"Bad request: {e}"}
+        data = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 422: "Unprocessable Entity"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        logging.info(f"Simulation service listening on {unix_path or f'{host}:{port}'}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.solver_thread.shutdown()
+        self.batch_pool.close()
+
+
+async def request(netlist, host="127.0.0.1", port=8765, unix_path=None, path="/solve"):
+    """
+    Test client: send one netlist (a dict of columns, or None for GET /health)
+    and return (status, decoded JSON reply).
+    """
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    if netlist is None:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    else:
+        body = json.dumps({key: np.asarray(value).tolist() for key, value in netlist.items()
+                           if value is not None}).encode()
+        writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    reply = await reader.read()
+    writer.close()
+    head, _, body = reply.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def netlist_from_circuit(path):
+    """
+    Columns of a saved circuit with wire-connected terminals merged into one
+    node id, ready to send to the service.
+    """
+    from netlist_io import read_circuit_state, build_simulator
+    simulator, _ = build_simulator(read_circuit_state(path))
+    simulator.build_union_find()
+    ground = simulator.uf.find(0)
+    elements = [e for e in simulator.elements if e.element_type != 'wire']
+    if any(None in e.nodes for e in elements):
+        raise ValueError(f"{path} has unconnected terminals")
+    nodes = [[0 if simulator.uf.find(n) == ground else simulator.uf.find(n) for n in e.nodes] for e in elements]
+    return {"types": [e.element_type for e in elements], "nodes": nodes,
+            "values": [e.value for e in elements], "names": [e.name for e in elements]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve circuit solves over localhost HTTP or a Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on (or connect to) this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, help="process pool size for large batches")
+    parser.add_argument("--client", metavar="FILE", help="send a saved circuit to a running service and print the reply")
+    args = parser.parse_args(argv)
+
+    if args.client:
+        status, reply = asyncio.run(request(netlist_from_circuit(args.client), args.host, args.port, args.unix))
+        json.dump(reply, sys.stdout, indent=1)
+        print()
+        return 0 if status == 200 else 1
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    service = SimulationService(args.workers)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
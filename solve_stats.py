@@ -0,0 +1,89 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class SolveStats:
+    """
+    Per-phase measurements of one solve_circuit run: wall time and, when
+    memory tracing is on, the peak of traced allocations above the phase's
+    starting point (numpy buffers are traced too). Phases are kept in the order
+    they first ran; add() accumulates sub-phase times such as the rank check
+    and LAPACK solve of every block (summed over worker threads). Names with a
+    dot ("solve.rank_check") are such sub-phases and are left out of total().
+    With mode "cprofile" the whole run is profiled and the top functions are
+    kept as text in profile_report.
+    """
+    MODES = (None, "memory", "cprofile")
+
+    def __init__(self, mode=None):
+        self.mode = mode
+        self.stages = {}
+        self.profile_report = None
+        self.profiler = None
+        self.started_tracing = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.mode == "memory" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        elif self.mode == "cprofile":
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        if self.profiler is not None:
+            import io
+            import pstats
+            self.profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(30)
+            self.profile_report = out.getvalue()
+            self.profiler = None
+
+    @contextmanager
+    def stage(self, name):
+        # Per-phase peaks need tracemalloc.reset_peak (Python 3.9+); on 3.8 only times are kept.
+        tracing = tracemalloc.is_tracing() and self.mode == "memory" and hasattr(tracemalloc, "reset_peak")
+        if tracing:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] - baseline if tracing else None
+            self.add(name, seconds, peak)
+
+    def add(self, name, seconds, peak_bytes=None):
+        with self.lock:
+            entry = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0, "peak_bytes": None})
+            entry["seconds"] += seconds
+            entry["calls"] += 1
+            if peak_bytes is not None:
+                entry["peak_bytes"] = max(entry["peak_bytes"] or 0, peak_bytes)
+
+    def total(self):
+        return sum(entry["seconds"] for name, entry in self.stages.items() if "." not in name)
+
+    def as_dict(self):
+        return {"mode": self.mode, "total": self.total(), "stages": {k: dict(v) for k, v in self.stages.items()}}
+
+    def report(self):
+        """
+        Plain-text breakdown, slowest phase first.
+        """
+        total = self.total() or 1.0
+        lines = [f"{'Phase':28} {'Time (s)':>10} {'%':>6} {'Peak MB':>9}"]
+        for name, entry in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"]):
+            peak = "" if entry["peak_bytes"] is None else f"{entry['peak_bytes'] / 2**20:.2f}"
+            lines.append(f"{name:28} {entry['seconds']:10.4f} {100 * entry['seconds'] / total:6.1f} {peak:>9}")
+        lines.append(f"{'total':28} {self.total():10.4f}")
+        return "\n".join(lines)
@@ -0,0 +1,53 @@
+import logging
+import queue
+import threading
+
+from circuit_simulator import SimulationCancelled
+
+
+class SolveWorker:
+    """
+    Runs solve_circuit on a snapshot of the netlist in a background thread.
+    Progress and the final outcome are posted to a queue which the Tk main loop
+    drains with `after`, so no Tk call is ever made from the worker thread.
+    Dense solves spend their time inside LAPACK, which releases the GIL.
+    """
+    def __init__(self, simulator):
+        self.simulator = simulator.snapshot()
+        self.revision = self.simulator.revision
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="SolveWorker", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        logging.debug(f"Started background solve for netlist revision {self.revision}")
+
+    def cancel(self):
+        self.cancel_event.set()
+        logging.debug(f"Cancellation requested for netlist revision {self.revision}")
+
+    def run(self):
+        self.simulator.cancel_event = self.cancel_event
+        self.simulator.progress_callback = lambda phase: self.messages.put(("progress", phase))
+        try:
+            result = self.simulator.solve_circuit(show_errors=False)
+        except SimulationCancelled:
+            self.messages.put(("cancelled", None))
+            return
+        except Exception as e:
+            logging.error(f"Background solve failed: {e}")
+            self.messages.put(("error", str(e)))
+            return
+        self.messages.put(("done", result))
+
+    def drain(self):
+        """
+        Return all messages posted so far without blocking.
+        """
+        pending = []
+        while True:
+            try:
+                pending.append(self.messages.get_nowait())
+            except queue.Empty:
+                return pending
@@ -0,0 +1,75 @@
+from collections import deque
+
+
+def structural_rank(num_cols, adjacency):
+    """
+    Structural rank of a sparsity pattern: the size of a maximum matching between
+    rows and columns (Hopcroft-Karp, iterative so long chains don't hit the
+    recursion limit). adjacency[r] lists the columns with a nonzero in row r.
+    Also returns the unmatched rows, which name the structurally dependent equations.
+    """
+    num_rows = len(adjacency)
+    match_row = [-1] * num_rows
+    match_col = [-1] * num_cols
+
+    # Greedy start: most rows of an MNA pattern match their diagonal immediately.
+    for r, cols in enumerate(adjacency):
+        for c in cols:
+            if match_col[c] == -1:
+                match_row[r] = c
+                match_col[c] = r
+                break
+
+    infinity = num_rows + 1
+    while True:
+        dist = [infinity] * num_rows
+        queue = deque()
+        for r in range(num_rows):
+            if match_row[r] == -1:
+                dist[r] = 0
+                queue.append(r)
+        found_free = False
+        while queue:
+            r = queue.popleft()
+            for c in adjacency[r]:
+                r2 = match_col[c]
+                if r2 == -1:
+                    found_free = True
+                elif dist[r2] == infinity:
+                    dist[r2] = dist[r] + 1
+                    queue.append(r2)
+        if not found_free:
+            break
+
+        augmented = False
+        for root in range(num_rows):
+            if match_row[root] != -1:
+                continue
+            stack = [(root, iter(adjacency[root]))]
+            cols = []
+            while stack:
+                r, it = stack[-1]
+                for c in it:
+                    r2 = match_col[c]
+                    if r2 == -1:
+                        cols.append(c)
+                        for (row, _), col in zip(stack, cols):
+                            match_row[row] = col
+                            match_col[col] = row
+                        augmented = True
+                        stack = []
+                        break
+                    if dist[r2] == dist[r] + 1:
+                        cols.append(c)
+                        stack.append((r2, iter(adjacency[r2])))
+                        break
+                else:
+                    dist[r] = infinity
+                    stack.pop()
+                    if cols:
+                        cols.pop()
+        if not augmented:
+            break
+
+    unmatched = [r for r in range(num_rows) if match_row[r] == -1]
+    return num_rows - len(unmatched), unmatched
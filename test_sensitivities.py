@@ -0,0 +1,38 @@
+import numpy as np
+
+from netlist_builder import NetlistBuilder
+
+
+def divider():
+    builder = NetlistBuilder()
+    builder.add('voltage_source', 1, 0, 10.0)
+    builder.add('resistor', 1, 2, 100.0)
+    builder.add('resistor', 2, 0, 100.0)
+    return builder.build()
+
+
+def test_sensitivities_after_adopting_a_snapshot_solve():
+    direct = divider()
+    direct.solve_circuit(show_errors=False)
+    expected = direct.sensitivities()["dv"]
+
+    live = divider()
+    solved = live.snapshot()
+    node_voltages, _ = solved.solve_circuit(show_errors=False)
+    assert node_voltages is not None
+    live.adopt_solution(solved)
+    result = live.sensitivities()
+
+    assert result is not None
+    np.testing.assert_allclose(result["dv"], expected)
+    np.testing.assert_allclose(expected, [[1.0, 0.0, 0.0], [0.5, -0.025, 0.025]])
+
+
+def test_repeated_sensitivities_reuse_the_block_inverses():
+    simulator = divider()
+    simulator.solve_circuit(show_errors=False)
+    first = simulator.sensitivities()["dv"]
+    inverses = simulator.last_system["adjoint_inverses"]
+    assert len(inverses) == len(simulator.last_system["blocks"])
+    np.testing.assert_allclose(simulator.sensitivities([2])["dv"], first[1:])
+    assert simulator.last_system["adjoint_inverses"] is inverses
@@ -0,0 +1,70 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class TopologyCache:
+    """
+    Bounded LRU cache of structure-only analysis (merged nodes, node ordering,
+    floating/validation results, element table rows and the stamping pattern),
+    keyed by topology fingerprint. Shared between a simulator and its snapshots,
+    so it is guarded by a lock.
+    """
+    def __init__(self, max_entries=32, max_bytes=256 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        """
+        Insert or re-measure an entry, then evict least recently used entries
+        until both the entry-count and memory bounds hold.
+        """
+        size = self.estimate_size(entry)
+        with self.lock:
+            self.total_bytes -= self.sizes.get(key, 0)
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.sizes[key] = size
+            self.total_bytes += size
+            while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+                old_key, _ = self.entries.popitem(last=False)
+                self.total_bytes -= self.sizes.pop(old_key)
+                logging.debug(f"Evicted topology {old_key[0]} from structure cache")
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.total_bytes = 0
+
+    @staticmethod
+    def estimate_size(entry):
+        size = 0
+        for value in entry.values():
+            if isinstance(value, np.ndarray):
+                size += value.nbytes
+            elif isinstance(value, dict):
+                size += TopologyCache.estimate_size(value) + 100 * len(value)
+            elif isinstance(value, (list, set)):
+                size += 64 * len(value)
+            elif hasattr(value, "parent"):
+                size += 200 * len(value.parent)
+        return size